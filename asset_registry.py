@@ -0,0 +1,136 @@
+# Module with the registry of decoded image assets
+
+##########################################################################################
+# Imports
+##########################################################################################
+import os
+import threading
+import numpy as np
+import matplotlib.pyplot as plt
+
+from pathlib import Path
+from numpy.typing import NDArray
+from typing import Dict, Iterable, Tuple, Union
+
+from .game_parameters import RENDER_DPI
+
+###########################################
+# Sprite helpers
+###########################################
+
+def load_sprite(path: Union[str, Path]) -> NDArray[np.uint8]:
+    """Decode an image file into a uint8 RGBA array."""
+    raw = plt.imread(path)
+    img = np.asarray(raw)
+    if img.dtype != np.uint8:
+        img = np.rint(np.clip(img, 0, 1) * 255).astype(np.uint8)
+    if img.ndim == 2:
+        img = np.stack([img, img, img], axis=-1)
+    if img.shape[2] == 3:
+        alpha = np.full(img.shape[:2] + (1,), 255, dtype=np.uint8)
+        img = np.concatenate([img, alpha], axis=-1)
+    return img
+
+
+def sprite_size(sprite: NDArray, coin_zoom: float, dpi: float = RENDER_DPI) -> int:
+    """Edge in pixels of a sprite drawn with the given zoom, scaled by dpi / 72 as matplotlib's OffsetImage does."""
+    native = max(sprite.shape[0], sprite.shape[1])
+    return max(1, int(round(native * coin_zoom * dpi / 72)))
+
+
+def scale_sprite(sprite: NDArray[np.uint8], size: int) -> NDArray[np.float32]:
+    """Downscale a sprite to (size, size) float RGBA in [0, 1] by averaging the pixels of each output bin."""
+    assert(size > 0), f"Sprite size must be positive (but got {size})."
+    sprite = sprite.astype(np.float32) / 255.0
+    h, w = sprite.shape[:2]
+    if size > h or size > w:
+        rows = np.linspace(0, h, size, endpoint=False).astype(int)
+        cols = np.linspace(0, w, size, endpoint=False).astype(int)
+        return sprite[rows][:, cols]
+    # Average with alpha-premultiplied colors so transparent pixels do not bleed
+    sprite[..., :3] *= sprite[..., 3:]
+    row_edges = np.linspace(0, h, size + 1).astype(int)[:-1]
+    col_edges = np.linspace(0, w, size + 1).astype(int)[:-1]
+    summed = np.add.reduceat(np.add.reduceat(sprite, row_edges, axis=0), col_edges, axis=1)
+    counts = np.outer(np.diff(np.append(row_edges, h)), np.diff(np.append(col_edges, w)))
+    scaled = summed / counts[..., None]
+    alpha = scaled[..., 3:]
+    scaled[..., :3] = np.divide(scaled[..., :3], alpha, out=np.zeros_like(scaled[..., :3]), where=alpha > 0)
+    return scaled.astype(np.float32)
+
+###########################################
+# Asset registry
+###########################################
+
+class AssetRegistry:
+    """Decodes each image once per process and keeps its pre-scaled variants.
+
+    All the arrays handed out are read-only views shared by every caller.
+    """
+
+    def __init__(self) -> None:
+        self._decoded: Dict[str, NDArray[np.uint8]] = dict()
+        self._scaled: Dict[Tuple[str, int], NDArray[np.float32]] = dict()
+        self._native_float: Dict[str, NDArray[np.float32]] = dict()
+        self._lock = threading.Lock()
+        self.decodes = 0
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        # Pure string manipulation, so that cache hits do not touch the file system
+        return os.path.abspath(path)
+
+    def get(self, path: Union[str, Path]) -> NDArray[np.uint8]:
+        """Decoded uint8 RGBA image at its native size."""
+        key = self._key(path)
+        img = self._decoded.get(key)
+        if img is None:
+            with self._lock:
+                img = self._decoded.get(key)
+                if img is None:
+                    img = load_sprite(key)
+                    img.flags.writeable = False
+                    self._decoded[key] = img
+                    self.decodes += 1
+        return img.view()
+
+    def get_float(self, path: Union[str, Path]) -> NDArray[np.float32]:
+        """Float RGBA image in [0, 1] at its native size (what matplotlib resamples fastest)."""
+        key = self._key(path)
+        img = self._native_float.get(key)
+        if img is None:
+            img = self.get(path).astype(np.float32) / 255.0
+            img.flags.writeable = False
+            self._native_float[key] = img
+        return img.view()
+
+    def get_scaled(self, path: Union[str, Path], size: int) -> NDArray[np.float32]:
+        """Float RGBA image scaled to (size, size)."""
+        key = (self._key(path), size)
+        img = self._scaled.get(key)
+        if img is None:
+            img = scale_sprite(self.get(path), size)
+            img.flags.writeable = False
+            self._scaled[key] = img
+        return img.view()
+
+    def get_for_zoom(self, path: Union[str, Path], coin_zoom: float) -> NDArray[np.float32]:
+        """Image scaled the way it is drawn with the given zoom."""
+        return self.get_scaled(path, sprite_size(self.get(path), coin_zoom))
+
+    def warm_up(self, paths: Iterable[Union[str, Path]], coin_zooms: Iterable[float] = ()) -> None:
+        """Decode the images (and their variants for the given zooms) ahead of the first render."""
+        coin_zooms = list(coin_zooms)
+        for path in paths:
+            self.get(path)
+            for coin_zoom in coin_zooms:
+                self.get_for_zoom(path, coin_zoom)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._decoded.clear()
+            self._scaled.clear()
+            self._native_float.clear()
+
+
+ASSETS = AssetRegistry()
@@ -0,0 +1,253 @@
+# Module with the micro-benchmarks of the core game objects
+#
+# Compare against the stored baseline, or record a new one after an intended change
+# (baselines are machine dependent, record them on the machine that runs the checks):
+#   bash docker/run bash -c "cd / && python -m experiment.benchmarks"
+#   bash docker/run bash -c "cd / && python -m experiment.benchmarks --update-baseline"
+
+##########################################################################################
+# Imports
+##########################################################################################
+import json
+import timeit
+import logging
+import argparse
+import platform
+
+from pathlib import Path
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from .helper_classes import (
+    World,
+    SliderValues,
+    ForagerPositions,
+    WealthTracker,
+)
+from .custom_node import CustomNode
+from .custom_front_end import PositioningControl
+from .precompute import PRECOMPUTER
+from .game_parameters import (
+    NUM_FORAGERS,
+    NUM_CENTROIDS,
+    NUM_COINS,
+    DISPERSION,
+    STARTING_OVERHEAD,
+    STARTING_PREROGATIVE,
+    STARTING_WAGES,
+    INITIAL_WEALTH,
+    IMAGE_PATHS,
+    BENCHMARK_BASELINE_PATH,
+)
+
+###########################################
+# Fixtures
+###########################################
+
+EXPERIMENT_DIR = Path(__file__).parent
+
+
+class MockTrial:
+    """Stands in for a finalized PsyNet trial: its label, answer and vars are all the game code reads."""
+
+    def __init__(self, label: str, answer: Optional[Dict[str, Any]] = None, forager_id: Optional[int] = None) -> None:
+        self.label = label
+        self.answer = answer
+        self.var = SimpleNamespace(forager_id=forager_id)
+
+    def __str__(self) -> str:
+        return self.label
+
+
+def make_world(num_coins: int = NUM_COINS, size: Optional[int] = None, seed: int = 0) -> World:
+    world = World(
+        num_coins=num_coins,
+        num_centroids=NUM_CENTROIDS,
+        distribution="linear",
+        dispersion=DISPERSION,
+        width=size,
+        height=size,
+        seed=seed,
+    )
+    world.coin_path = EXPERIMENT_DIR / IMAGE_PATHS["coin_url"]
+    world.forager_path = IMAGE_PATHS["forager_url"]
+    return world
+
+
+def make_positions(world: World) -> ForagerPositions:
+    positions = ForagerPositions()
+    for i in range(NUM_FORAGERS):
+        positions.add_forager_position((world.height * (i + 1) / (NUM_FORAGERS + 1), world.width / 2))
+    return positions
+
+
+def make_trials(world: World) -> List[MockTrial]:
+    """Coordinator and forager trials of one completed node."""
+    coordinator = MockTrial(
+        "CoordinatorTrial",
+        answer={"overhead": STARTING_OVERHEAD, "custom_front_end_to_position_foragers": make_positions(world)},
+    )
+    foragers = [MockTrial(f"ForagerTrial-{i}", forager_id=i) for i in range(NUM_FORAGERS)]
+    return [coordinator] + foragers
+
+
+def make_node(world: World) -> SimpleNamespace:
+    definition = {
+        "world": world.to_dict(),
+        "overhead": STARTING_OVERHEAD,
+        "prerogative": STARTING_PREROGATIVE,
+        "wages": STARTING_WAGES,
+        "wealth": INITIAL_WEALTH,
+    }
+    return SimpleNamespace(definition=definition, seed=definition, context=IMAGE_PATHS)
+
+###########################################
+# Benchmarks
+###########################################
+
+# Each benchmark builds its fixtures once and returns the operation to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = dict()
+
+
+def benchmark(name: str) -> Callable:
+    def register(setup: Callable[[], Callable[[], Any]]) -> Callable[[], Callable[[], Any]]:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+# (coins, grid size) of the worlds timed, from the experiment's default up to large worlds
+WORLD_SIZES = [(NUM_COINS, World.width), (1000, 200), (10000, 400), (100000, 2000)]
+
+
+def world_init(num_coins: int, size: int) -> Callable[[], Callable[[], Any]]:
+    return lambda: lambda: make_world(num_coins, size)
+
+
+for _num_coins, _size in WORLD_SIZES:
+    benchmark(f"world_init[{_num_coins}@{_size}]")(world_init(_num_coins, _size))
+
+
+@benchmark("world_render")
+def world_render() -> Callable[[], Any]:
+    world = make_world()
+    return lambda: world.render(coin_zoom=1 / NUM_COINS, coin_percentage=0.5, seed=0)
+
+
+@benchmark("positioning_control_init")
+def positioning_control_init() -> Callable[[], Any]:
+    # After the first page load the map comes from the render cache, as for every later participant
+    world = make_world()
+    PositioningControl(world=world, investment=0.5)
+    return lambda: PositioningControl(world=world, investment=0.5)
+
+
+@benchmark("forager_positions_assign")
+def forager_positions_assign() -> Callable[[], Any]:
+    world = make_world()
+
+    def assign_all() -> None:
+        positions = make_positions(world)
+        for trial_id in range(NUM_FORAGERS):
+            positions.get_forager_position(trial_id)
+    return assign_all
+
+
+@benchmark("wealth_tracker_update_from_trials")
+def wealth_tracker_update_from_trials() -> Callable[[], Any]:
+    world = make_world()
+    trials = make_trials(world)
+    slider = SliderValues()
+    return lambda: WealthTracker().update_from_trials(trials, slider, world)
+
+
+@benchmark("custom_node_summarize_trials")
+def custom_node_summarize_trials() -> Callable[[], Any]:
+    # Time with precompute_disabled(), or the background renders of the next maps compete with the timed calls
+    world = make_world()
+    node = make_node(world)
+    trials = make_trials(world)
+    return lambda: CustomNode.summarize_trials(node, trials, None, None)
+
+###########################################
+# Runner
+###########################################
+
+@contextmanager
+def precompute_disabled() -> Iterator[None]:
+    """Pause the background precomputation of the next maps (see precompute.py) while timing."""
+    enabled = PRECOMPUTER.enabled
+    PRECOMPUTER.enabled = False
+    try:
+        yield
+    finally:
+        PRECOMPUTER.enabled = enabled
+
+
+def time_operation(operation: Callable[[], Any], repeats: int = 5) -> float:
+    """Best time per call in seconds, over repeats of enough calls to last about 0.2 s each.
+
+    Info logs are silenced while timing, so that results do not depend on where the logs go (console, pytest capture).
+    """
+    previous = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        timer = timeit.Timer(operation)
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat=repeats, number=number)) / number
+    finally:
+        logging.disable(previous)
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeats: int = 5) -> Dict[str, float]:
+    names = list(BENCHMARKS) if names is None else names
+    with precompute_disabled():
+        return {name: time_operation(BENCHMARKS[name](), repeats) for name in names}
+
+
+def load_baseline(path: Union[str, Path] = BENCHMARK_BASELINE_PATH) -> Dict[str, float]:
+    path = Path(path)
+    if not path.exists():
+        return dict()
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(results: Dict[str, float], path: Union[str, Path] = BENCHMARK_BASELINE_PATH) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the core game objects against the stored baseline.")
+    parser.add_argument("names", type=str, nargs="*", help="Benchmarks to run (default: all).")
+    parser.add_argument("--baseline", type=str, default=str(BENCHMARK_BASELINE_PATH))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.names or None, args.repeats)
+    baseline = load_baseline(args.baseline)
+    print(f"{'benchmark':<40}{'time (ms)':>12}{'baseline (ms)':>16}{'ratio':>8}")
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        ratio = f"{seconds / reference:>8.2f}" if reference else f"{'-':>8}"
+        reference = f"{1000 * reference:>16.4f}" if reference else f"{'-':>16}"
+        print(f"{name:<40}{1000 * seconds:>12.4f}{reference}{ratio}")
+
+    if args.update_baseline:
+        save_baseline({**baseline, **results}, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
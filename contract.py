@@ -0,0 +1,80 @@
+# Module with the contract kernel that turns production into payoffs
+
+##########################################################################################
+# Imports
+##########################################################################################
+import numpy as np
+
+from numpy.typing import NDArray, ArrayLike
+from typing import Tuple
+
+###########################################
+# Contract kernel
+###########################################
+
+def contract_payoffs(
+    overhead: ArrayLike,
+    wages: ArrayLike,
+    prerogative: ArrayLike,
+    productions: ArrayLike,
+) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Coordinator and forager payoffs for every (contract setting, production profile) pair.
+
+    The contract works as follows, for a total production T:
+        - The coordinator takes the overhead, overhead * T, off the top.
+        - Of what remains, a fraction wages is paid as a flat wage, split evenly among the foragers.
+        - The rest is paid as a commission, proportional to each forager's production
+          (evenly if nobody produced anything).
+    The payoffs always add up to T. The coordinator prerogative is taken per setting, but as in the
+    game so far it does not change the split.
+
+    Args:
+        :param overhead: (S,) overhead of each setting (scalars are broadcast).
+        :param wages: (S,) wages commission of each setting.
+        :param prerogative: (S,) coordinator prerogative of each setting.
+        :param productions: (P, F) coins produced by each of the F foragers in P profiles, or (F,).
+
+    Returns:
+        (S, P) coordinator payoffs and (S, P, F) forager payoffs.
+    """
+    overhead, wages, prerogative = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(overhead, dtype=np.float64)),
+        np.atleast_1d(np.asarray(wages, dtype=np.float64)),
+        np.atleast_1d(np.asarray(prerogative, dtype=np.float64)),
+    )
+    productions = np.atleast_2d(np.asarray(productions, dtype=np.float64))
+    num_foragers = productions.shape[1]
+
+    total = productions.sum(axis=1)                                        # (P,)
+    shares = np.divide(
+        productions,
+        total[:, None],
+        out=np.full(productions.shape, 1 / num_foragers),
+        where=total[:, None] > 0,
+    )                                                                      # (P, F)
+
+    coordinator = overhead[:, None] * total[None, :]                       # (S, P)
+    remaining = total[None, :] - coordinator
+    wage_pool = wages[:, None] * remaining
+    commission_pool = remaining - wage_pool
+
+    foragers = (
+        (wage_pool / num_foragers)[:, :, None]
+        + commission_pool[:, :, None] * shares[None, :, :]
+    )                                                                      # (S, P, F)
+    return coordinator, foragers
+
+
+def settings_grid(
+    overheads: ArrayLike,
+    wages: ArrayLike,
+    prerogatives: ArrayLike,
+) -> Tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """Flattened (overhead, wages, prerogative) arrays covering every combination of the given values."""
+    grid = np.meshgrid(
+        np.asarray(overheads, dtype=np.float64),
+        np.asarray(wages, dtype=np.float64),
+        np.asarray(prerogatives, dtype=np.float64),
+        indexing="ij",
+    )
+    return tuple(axis.ravel() for axis in grid)
@@ -6,9 +6,10 @@
 from pathlib import Path
 from markupsafe import Markup
 from typing import (
-    Any, Union, List,
+    Any, Union, List, Optional,
 )
 
+from psynet.bot import BotResponse
 from psynet.page import  InfoPage
 from psynet.utils import get_logger
 from psynet.modular_page import (
@@ -27,12 +28,18 @@ from .custom_front_end import (
     HelloPrompt,
     PositioningControl,
 )
-from .helper_classes import RewardProcessing
+from .helper_classes import (
+    World,
+)
 from .custom_pages import (
     WellBeingReportPage,
     SliderSettingPage,
 )
-from .helper_functions import get_world_wealth_slider_from_node
+from .helper_functions import get_world_wealth_slider_from_node, get_reward_text_from_node
+from .policies import get_bot_policy, bot_rng
+from .instrumentation import METRICS
+from .profiling import PROFILER
+from .game_parameters import SLIDER_STEPS
 
 logger = get_logger()
 
@@ -48,7 +55,11 @@ class InvestingPage(ModularPage):
     def __init__(
             self,
             time_estimate: float,
+            world: Optional[World] = None,
+            wealth: Optional[float] = None,
     ) -> None:
+        self.world = world
+        self.wealth = wealth
 
         information_text = Markup("""
         <h3>Page (2/6)</h3>
@@ -65,12 +76,16 @@ class InvestingPage(ModularPage):
                 start_value=0.5,
                 min_value=0,
                 max_value=1,
-                n_steps=100,
+                n_steps=SLIDER_STEPS,
             ),
             time_estimate=time_estimate,
             save_answer="investment"
         )
 
+    def get_bot_response(self, experiment, bot) -> BotResponse:
+        investment = get_bot_policy().choose_investment(self.world, self.wealth, bot_rng(bot))
+        return BotResponse(raw_answer=investment)
+
     def format_answer(self, raw_answer, **kwargs) -> str:
         try:
             investment = float(raw_answer)
@@ -96,6 +111,8 @@ class CoordinatorTrial(CreateTrialMixin, ImitationChainTrial):
     time_estimate = 5
     accumulate_answers = True
 
+    @METRICS.timed("coordinator_trial.show_trial")
+    @PROFILER.profiled("coordinator_trial.show_trial")
     def show_trial(self, experiment, participant) -> List[Any]:
         # import pydevd_pycharm
         # pydevd_pycharm.settrace('localhost', port=12345, stdout_to_server=True, stderr_to_server=True)
@@ -123,6 +140,8 @@ class CoordinatorTrial(CreateTrialMixin, ImitationChainTrial):
             ),
             InvestingPage(
                 time_estimate=self.time_estimate,
+                world=world,
+                wealth=wealth,
             ),
             PageMaker(
                 lambda participant: ModularPage(
@@ -146,8 +165,9 @@ class CoordinatorTrial(CreateTrialMixin, ImitationChainTrial):
                 time_estimate=self.time_estimate,
             ),
             InfoPage(
-                RewardProcessing.get_reward_text(
-                    n_coins=wealth,
+                get_reward_text_from_node(
+                    self.origin,
+                    wealth=wealth,
                     slider=world_slider,
                     trial_type="coordinator"
                 ),
@@ -3,7 +3,9 @@
 ##########################################################################################
 # Imports
 ##########################################################################################
-from typing import Union
+import base64
+
+from typing import Union, Tuple
 from markupsafe import Markup
 
 from psynet.modular_page import (
@@ -11,13 +13,23 @@ from psynet.modular_page import (
     ImagePrompt,
     Control,
 )
+from psynet.bot import BotResponse
 from psynet.utils import get_logger
 
 from .helper_classes import (
     World,
     ForagerPositions,
 )
-from .game_parameters import NUM_COINS
+from .render_cache import RENDER_CACHE
+from .render_engine import png_data_url
+from .policies import get_bot_policy, bot_rng
+from .instrumentation import METRICS
+from .game_parameters import (
+    NUM_COINS,
+    MAP_TRANSPORT,
+    STAGE_SIZE,
+    FORAGER_ICON_SIZE,
+)
 
 logger = get_logger()
 
@@ -55,26 +67,72 @@ class PositioningControl(Control):
     macro = "positioning_area"
     external_template = "custom-controls.html"
 
+    @METRICS.timed("positioning_control.init")
     def __init__(
         self,
         world:World,
         investment:int,
+        mode:str=MAP_TRANSPORT,
     ) -> None:
         super().__init__()
-        map_numpy = world.render(
-            show=False,
-            coin_percentage=investment,
-            coin_zoom=1 / NUM_COINS
-        )
-        self.map = map_numpy.tolist()
+        assert(mode in ["png", "coins"]), f"Invalid mode: {mode}. Expected 'png' or 'coins'."
+        self.mode = mode
+        self.world = world
+        self.investment = investment
+        if mode == "png":
+            # The server renders the map and ships it as a compressed image
+            map_png = RENDER_CACHE.get_png(
+                world=world,
+                investment=investment,
+                coin_zoom=1 / NUM_COINS,
+            )
+            self.map_url = png_data_url(map_png)
+            METRICS.count("map_payload_bytes", len(self.map_url))
+        else:
+            # The browser draws the coin sprite at the visible cells, sent as base64 int16 (row, col) pairs
+            visible = world.visible_coins(
+                coin_percentage=RENDER_CACHE.quantize_investment(investment),
+            )
+            self.coins = base64.b64encode(visible.astype("<i2").tobytes()).decode("ascii")
+            METRICS.count("map_payload_bytes", len(self.coins))
+            self.coin_url = world.coin_path
+        self.world_width = world.width
+        self.world_height = world.height
+        self.stage_size = STAGE_SIZE
+        self.forager_icon_size = FORAGER_ICON_SIZE
         self.forager_url = world.forager_path
         self.num_foragers = world.num_foragers
 
+    def get_bot_response(self, experiment, bot, page, prompt) -> BotResponse:
+        # The bot sees the same coins as the map shown to a participant with this investment
+        visible = self.world.visible_coins(
+            coin_percentage=RENDER_CACHE.quantize_investment(self.investment),
+        )
+        positions = get_bot_policy().place_foragers(self.world, visible, bot_rng(bot), self.num_foragers)
+        raw_answer = {str(i): list(self.world_to_stage(position)) for i, position in enumerate(positions)}
+        return BotResponse(raw_answer=raw_answer)
+
     def format_answer(self, raw_answer, **kwargs):
         forager_positions = ForagerPositions()
         for position in raw_answer.values():
-            forager_positions.add_forager_position(position)
+            forager_positions.add_forager_position(self.stage_to_world(position))
         logger.info(f"Foragers positions: {forager_positions}")
         return forager_positions
 
+    def stage_to_world(self, position: Tuple[float, float]) -> Tuple[float, float]:
+        """Convert the (left, top) pixel offset of a forager icon into the (row, col) world cell under its center."""
+        left, top = position
+        half_icon = self.forager_icon_size / 2
+        row = (top + half_icon) / self.stage_size * self.world_height
+        col = (left + half_icon) / self.stage_size * self.world_width
+        return (row, col)
+
+    def world_to_stage(self, position: Tuple[float, float]) -> Tuple[float, float]:
+        """Inverse of stage_to_world: (left, top) pixel offset of an icon centered on the (row, col) position."""
+        row, col = position
+        half_icon = self.forager_icon_size / 2
+        left = col / self.world_width * self.stage_size - half_icon
+        top = row / self.world_height * self.stage_size - half_icon
+        return (left, top)
+
 ###########################################
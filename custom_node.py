@@ -11,6 +11,9 @@ from .helper_classes import (
     SliderValues,
     WealthTracker,
 )
+from .helper_functions import get_world_wealth_slider_from_node
+from .instrumentation import METRICS
+from .precompute import reward_texts, precompute_next_node
 from .game_parameters import (
     POWER_ROLE,
     NUM_FORAGERS,
@@ -30,6 +33,7 @@ class CustomNode(CreateAndRateNodeMixin, ChainNode):
     def create_definition_from_seed(self, seed, experiment, participant):
         return seed
 
+    @METRICS.timed("custom_node.summarize_trials")
     def summarize_trials(self, trials: list, experiment, participant) -> None:
         # import pydevd_pycharm
         # pydevd_pycharm.settrace('localhost', port=12345, stdout_to_server=True, stderr_to_server=True)
@@ -39,8 +43,9 @@ class CustomNode(CreateAndRateNodeMixin, ChainNode):
         sliders.update_from_trials(trials)
 
         # Update wealth using results from players
+        world, _, _ = get_world_wealth_slider_from_node(self)
         accumulated_wealth = WealthTracker()
-        accumulated_wealth.update_from_trials(trials, sliders)
+        accumulated_wealth.update_from_trials(trials, sliders, world)
 
         # Update records
         seed = self.seed.copy()
@@ -48,5 +53,10 @@ class CustomNode(CreateAndRateNodeMixin, ChainNode):
         seed['prerogative'] = sliders.get_coordinator_prerogative()
         seed['wages'] = sliders.get_wages_commission()
         seed['wealth'] = accumulated_wealth.n_coins
+        seed['reward_texts'] = reward_texts(seed['wealth'], sliders)
+        METRICS.count("trials_summarized", len(trials))
+
+        # Render the next coordinator's maps while the next group assembles
+        precompute_next_node(self, seed)
 
         return seed
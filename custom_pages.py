@@ -5,6 +5,7 @@
 from typing import Union
 
 import psynet.experiment
+from psynet.bot import BotResponse
 from psynet.utils import get_logger
 from psynet.timeline import FailedValidation
 
@@ -15,6 +16,12 @@ from psynet.modular_page import (
 )
 
 from .helper_classes import SliderValues
+from .policies import (
+    to_slider,
+    get_bot_policy,
+    bot_rng,
+)
+from .game_parameters import SLIDER_STEPS
 
 logger = get_logger()
 
@@ -40,11 +47,14 @@ class WellBeingReportPage(ModularPage):
                 start_value=0.5,
                 min_value=0,
                 max_value=1,
-                n_steps=100,
+                n_steps=SLIDER_STEPS,
             ),
             time_estimate=time_estimate,
         )
 
+    def get_bot_response(self, experiment, bot) -> BotResponse:
+        return BotResponse(raw_answer=to_slider(bot_rng(bot).random()))
+
     def format_answer(self, raw_answer, **kwargs) -> Union[float, str]:
         try:
             coordinator_well_being = float(raw_answer)
@@ -79,6 +89,8 @@ class SliderSettingPage(ModularPage):
         The slider below displays the current level of {dimension}. Please move it to match your desired level of {dimension}.
         '''
         assert(dimension in ["overhead", "wages-commission", "prerogative"]), f"Invalid dimension: {dimension}. Expected 'overhead', 'wages-commission', 'prerogative'."
+        self.dimension = dimension
+        self.start_value = start_value
 
         super().__init__(
             dimension,
@@ -89,12 +101,20 @@ class SliderSettingPage(ModularPage):
                 start_value=start_value,
                 min_value=0,
                 max_value=1,
-                n_steps=100,
+                n_steps=SLIDER_STEPS,
             ),
             time_estimate=time_estimate,
             save_answer=dimension
         )
 
+    def get_bot_response(self, experiment, bot) -> BotResponse:
+        # Policies only set the overhead, the other dimensions are left where they are
+        if self.dimension == "overhead":
+            new_value = get_bot_policy().choose_overhead(self.start_value, None, bot_rng(bot))
+        else:
+            new_value = to_slider(self.start_value)
+        return BotResponse(raw_answer=new_value)
+
     def format_answer(self, raw_answer, **kwargs) -> Union[float, str]:
         try:
             new_value = float(raw_answer)
@@ -2,6 +2,9 @@
 ##########################################################################################
 # Imports
 ##########################################################################################
+from typing import List
+from pathlib import Path
+
 import psynet.experiment
 from psynet.utils import get_logger
 from psynet.timeline import Timeline
@@ -18,6 +21,9 @@ from .game_parameters import (
     NUM_COINS,
     LIST_OF_DISTRIBUTIONS,
     DISPERSION,
+    START_NODES_PER_DISTRIBUTION,
+    TRIALS_PER_PARTICIPANT,
+    WORLD_LIBRARY_PATH,
     STARTING_OVERHEAD,
     STARTING_PREROGATIVE,
     STARTING_WAGES,
@@ -26,6 +32,11 @@ from .game_parameters import (
     IMAGE_PATHS,
 )
 from .helper_classes import World
+from .world_library import WorldLibrary
+from .asset_registry import ASSETS
+from .profiling import PROFILER, register_profile_config
+from .group_scheduler import GROUP_SCHEDULER
+from .render_workers import RENDER_POOL
 
 ###########################################
 # Variables
@@ -34,32 +45,76 @@ from .helper_classes import World
 # logger
 logger = get_logger()
 
+# Decode the coin sprite once, before the first coordinator map is rendered
+ASSETS.warm_up([IMAGE_PATHS["coin_url"]], coin_zooms=[1 / NUM_COINS])
+
 # Create list of initial nodes
-start_nodes = [
-    CustomNode(
-        context=IMAGE_PATHS,
-        seed={
-            'world':World(
+def get_start_worlds() -> List[World]:
+    """Worlds for the start nodes, read from the world library when it has been built."""
+    if not WorldLibrary.exists():
+        logger.info(f"No world library at {WORLD_LIBRARY_PATH}, sampling the start worlds instead.")
+        return [
+            World(
                 num_coins=NUM_COINS,
                 num_centroids=NUM_CENTROIDS,
                 distribution=distribution,
                 dispersion=DISPERSION,
-            ),
+                seed=i,
+            )
+            for distribution in LIST_OF_DISTRIBUTIONS
+            for i in range(START_NODES_PER_DISTRIBUTION)
+        ]
+    library = WorldLibrary()
+    worlds = []
+    for distribution in LIST_OF_DISTRIBUTIONS:
+        indices = library.select(
+            distribution=distribution,
+            dispersion=DISPERSION,
+            num_centroids=NUM_CENTROIDS,
+            num_coins=NUM_COINS,
+        )
+        assert(len(indices) >= START_NODES_PER_DISTRIBUTION), f"The world library has {len(indices)} '{distribution}' worlds but {START_NODES_PER_DISTRIBUTION} are needed."
+        worlds += [library.get(i) for i in indices[:START_NODES_PER_DISTRIBUTION]]
+    return worlds
+
+start_nodes = [
+    CustomNode(
+        context=IMAGE_PATHS,
+        seed={
+            'world':world.to_dict(),
             'overhead':STARTING_OVERHEAD,
             'prerogative':STARTING_PREROGATIVE,
             'wages':STARTING_WAGES,
             'wealth':INITIAL_WEALTH
         }
     )
-    for distribution in LIST_OF_DISTRIBUTIONS
+    for world in get_start_worlds()
 ]
 
 ###########################################
 # Experiment
 ###########################################
 
+def extra_parameters():
+    from dallinger.config import get_config
+    register_profile_config(get_config())
+
 class CreateAndRateTrialMaker(CreateAndRateTrialMakerMixin, ImitationChainTrialMaker):
-    pass
+    """Fills the coordinator + forager groups of the parallel chains through the group scheduler."""
+
+    def find_networks(self, participant, experiment):
+        GROUP_SCHEDULER.begin()
+        outcome = super().find_networks(participant, experiment)
+        return GROUP_SCHEDULER.resolve(outcome, participant, self.wait_for_networks)
+
+    def prioritize_networks(self, networks, participant, experiment):
+        return GROUP_SCHEDULER.prioritize(self, networks, participant)
+
+    def get_trial_class(self, node, participant, experiment):
+        trial_class = super().get_trial_class(node, participant, experiment)
+        if trial_class is not None:
+            GROUP_SCHEDULER.record_assignment("coordinator" if trial_class is self.creator_class else "forager")
+        return trial_class
 
 trial_maker = CreateAndRateTrialMaker(
     n_creators=1,
@@ -75,8 +130,8 @@ trial_maker = CreateAndRateTrialMaker(
     # trial_maker params
     id_="create_and_rate_basic",
     chain_type="across",
-    expected_trials_per_participant=len(start_nodes),
-    max_trials_per_participant=len(start_nodes),
+    expected_trials_per_participant=TRIALS_PER_PARTICIPANT,
+    max_trials_per_participant=TRIALS_PER_PARTICIPANT,
     start_nodes=start_nodes,
     chains_per_experiment=len(start_nodes),
     balance_across_chains=False,
@@ -85,7 +140,7 @@ trial_maker = CreateAndRateTrialMaker(
     propagate_failure=False,
     recruit_mode="n_trials",
     target_n_participants=None,
-    wait_for_networks=False,
+    wait_for_networks=True,
     max_nodes_per_chain=MAX_NODES_PER_CHAIN,
 )
 
@@ -93,14 +148,25 @@ class Exp(psynet.experiment.Experiment):
     label = "Social roles and hierarchies skeleton experiment"
     initial_recruitment_size = 1
 
-    variables = {
-        'forager_positions': None
-    }
-
     timeline = Timeline(
         trial_maker,
     )
 
-    # test_n_bots = 6
+    test_n_bots = 6
+
+    @classmethod
+    def _route_timeline(cls, experiment, participant, mode):
+        # One profile covers the whole page load: show_trial, page makers and rendering
+        with PROFILER.profile("timeline"):
+            return super()._route_timeline(experiment, participant, mode)
+
+    @staticmethod
+    def gunicorn_post_worker_init(worker):
+        # Start the render processes of the web worker before its first map, which would otherwise wait for them
+        RENDER_POOL.start([Path(__file__).parent / IMAGE_PATHS["coin_url"]], coin_zooms=[1 / NUM_COINS])
+
+    @staticmethod
+    def gunicorn_worker_exit(server, worker):
+        RENDER_POOL.shutdown()
 
 ###########################################
\ No newline at end of file
@@ -8,9 +8,8 @@ import numpy as np
 from copy import deepcopy
 
 from markupsafe import Markup
-from typing import List, Tuple, Dict, Any
+from typing import List, Any
 
-import psynet.experiment
 from psynet.page import  InfoPage
 from psynet.utils import get_logger
 from psynet.modular_page import (
@@ -25,13 +24,15 @@ from psynet.trial.create_and_rate import (
 from psynet.trial.imitation_chain import ImitationChainTrial
 
 from .helper_classes import (
-    RewardProcessing,
     ForagerPositions,
 )
 # from .custom_pages import WellBeingReportPage
 from .coordinator_classes import CoordinatorTrial
-from .helper_functions import get_world_wealth_slider_from_node
+from .helper_functions import get_world_wealth_slider_from_node, get_reward_text_from_node
+from .forager_slots import claim_forager_position
 from .game_parameters import NUM_FORAGERS
+from .instrumentation import METRICS
+from .profiling import PROFILER
 
 logger = get_logger()
 
@@ -50,21 +51,23 @@ logger = get_logger()
 class ForagerTrial(SelectTrialMixin, ImitationChainTrial):
     time_estimate = 5
 
+    @METRICS.timed("forager_trial.show_trial")
+    @PROFILER.profiled("forager_trial.show_trial")
     def show_trial(self, experiment, participant) -> List[Any]:
         assert self.trial_maker.target_selection_method == "all"
 
         # Get participant info
         logger.info(f"My trial id is: {participant.id}")
 
-        # Get list of positions from target
-        positions = self.get_positions_from_target(experiment)
-        assert (isinstance(positions, ForagerPositions))
-        logger.info(f"positions: {positions}")
-
-        # Extract forager position
-        forager_id, location = positions.get_forager_position(participant.id)
-        experiment.var.set("forager_positions", deepcopy(positions))
-        assert(len(experiment.var.forager_positions) == NUM_FORAGERS)
+        # Claim a forager position, the positions come from the coordinator's answer the first time
+        target = self.get_coordinator_target()
+        forager_id, location = claim_forager_position(
+            self.origin,
+            target.id,
+            participant.id,
+            lambda: self.get_positions_from_target(target),
+        )
+        self.var.set("forager_id", int(forager_id))
 
         # Create target_strs
         rated_target_strs = [f"{target}" for target in self.targets if isinstance(target, CoordinatorTrial)]
@@ -98,8 +101,9 @@ class ForagerTrial(SelectTrialMixin, ImitationChainTrial):
                 time_estimate=self.time_estimate
             ),
             InfoPage(
-                RewardProcessing.get_reward_text(
-                    n_coins=wealth,
+                get_reward_text_from_node(
+                    self.origin,
+                    wealth=wealth,
                     slider=world_slider,
                     trial_type=f"forager-{forager_id}"
                 ),
@@ -111,28 +115,22 @@ class ForagerTrial(SelectTrialMixin, ImitationChainTrial):
         ]
         return list_of_pages
 
-    def get_positions_from_target(
-        self,
-        experiment: psynet.experiment.Experiment
-    ) -> Dict[str, Tuple[int, int]]:
-
-        positions_ = deepcopy(experiment.var.forager_positions)
-
-        if positions_ is None:
-            # There should be only one target
-            targets = [target for target in self.targets if isinstance(target, CoordinatorTrial)]
-            assert (len(targets) == 1), f"Error: Num. targets should be 1 but got {len(targets)}!"
-
-            # Get target from coordinator
-            target = targets[0]
-            if isinstance(target, CreateAndRateNode):
-                target = self.get_target_answer(target)
-            assert isinstance(target, CoordinatorTrial)
-
-            answers = self.get_target_answer(target)
-            positions = answers['custom_front_end_to_position_foragers']
-        else:
-            positions = positions_
+    def get_coordinator_target(self) -> CoordinatorTrial:
+        # There should be only one target
+        targets = [target for target in self.targets if isinstance(target, CoordinatorTrial)]
+        assert (len(targets) == 1), f"Error: Num. targets should be 1 but got {len(targets)}!"
+
+        # Get target from coordinator
+        target = targets[0]
+        if isinstance(target, CreateAndRateNode):
+            target = self.get_target_answer(target)
+        assert isinstance(target, CoordinatorTrial)
+        return target
+
+    def get_positions_from_target(self, target: CoordinatorTrial) -> ForagerPositions:
+        answers = self.get_target_answer(target)
+        # Copy, so that claims never modify the coordinator's answer
+        positions = deepcopy(answers['custom_front_end_to_position_foragers'])
 
         assert (len(positions) == NUM_FORAGERS)
         return positions
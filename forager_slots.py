@@ -0,0 +1,63 @@
+# Module with the assignment of the forager positions to concurrent foragers
+#
+# The positions placed by a coordinator are shared by the foragers of its node, whose pages may be
+# served at the same time by different workers. They are stored in the vars of the foragers' origin
+# node, keyed by the coordinator trial, so that the groups of different chains and nodes never share
+# a store. A claim locks the node row (SELECT ... FOR UPDATE), so that two foragers never take the same
+# slot or overwrite each other's claim, while claims on other nodes go ahead in parallel.
+
+##########################################################################################
+# Imports
+##########################################################################################
+from typing import Callable, Dict, Tuple
+
+from psynet.trial.main import TrialNode
+from psynet.utils import get_logger
+
+from .helper_classes import ForagerPositions
+from .instrumentation import METRICS
+
+logger = get_logger()
+
+###########################################
+# Slot claims
+###########################################
+
+# Node variable holding {coordinator trial id: ForagerPositions}
+POSITIONS_VARIABLE = "forager_positions"
+
+
+def claim_forager_position(
+    node: TrialNode,
+    coordinator_trial_id: int,
+    trial_id: int,
+    initial_positions: Callable[[], ForagerPositions],
+) -> Tuple[int, Tuple[float, float]]:
+    """Claims a forager slot for the trial and stores the claim on the node, atomically.
+
+    The row lock is held until the request's transaction commits, and waiting claims on the same node
+    then read the updated positions. A trial claiming again gets its first slot back.
+    initial_positions is only called when no positions have been stored for the coordinator trial yet.
+    """
+    with METRICS.span("forager_slots.claim"):
+        locked = (
+            TrialNode.query
+            .filter_by(id=node.id)
+            .with_for_update(of=TrialNode)
+            .populate_existing()
+            .one()
+        )
+        store: Dict[str, ForagerPositions] = dict(locked.var.get(POSITIONS_VARIABLE, None) or dict())
+        positions = store.get(str(coordinator_trial_id))
+        if positions is None:
+            positions = initial_positions()
+        assert isinstance(positions, ForagerPositions), f"Error: Expected ForagerPositions but got {type(positions)}"
+
+        forager_id, position = positions.get_forager_position(trial_id)
+        store[str(coordinator_trial_id)] = positions
+        locked.var.set(POSITIONS_VARIABLE, store)
+        logger.info(
+            f"Trial {trial_id} claimed forager {forager_id} at {position} on node {node.id} "
+            f"(coordinator trial {coordinator_trial_id}), {len(positions.free_ids)} slot(s) left."
+        )
+        return forager_id, position
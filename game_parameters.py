@@ -1,19 +1,134 @@
 # Module with the game parameters
 import numpy as np
 
+from pathlib import Path
+
 POWER_ROLE = "coordinator"
 NUM_FORAGERS = 2
 NUM_CENTROIDS = 2
 NUM_COINS = 100
 LIST_OF_DISTRIBUTIONS = ["linear"]
 DISPERSION = 10
+# Parallel chains per distribution, each played by its own coordinator + forager group (see group_scheduler.py)
+START_NODES_PER_DISTRIBUTION = 4
+# Trials of each participant, whatever the number of chains
+TRIALS_PER_PARTICIPANT = 1
 STARTING_OVERHEAD = 0.5
 STARTING_PREROGATIVE = 0.5
 STARTING_WAGES = 0.5
 INITIAL_WEALTH = 100
+# Positions of the investment and contract sliders on [0, 1]
+SLIDER_STEPS = 100
+
+# Foragers harvest the coins within this radius (in cells) of their position
+HARVEST_RADIUS = 10
+# How contested coins are shared: "independent", "nearest" or "split" (see harvest.py)
+HARVEST_RULE = "nearest"
+HARVEST_CHUNK_SIZE = 4096
+SPATIAL_INDEX_BUCKET_SIZE = 8
+
+# Size in pixels of the positioning stage and of the forager icons (see custom-controls.html)
+STAGE_SIZE = 800
+FORAGER_ICON_SIZE = 60
+
+# Ratio between the long and short axis variances of the "oval" clusters
+OVAL_ASPECT = 3.0
+# Rounds of batched resampling allowed to place the exact number of coins
+MAX_PLACEMENT_ROUNDS = 1000
 
 MAX_NODES_PER_CHAIN = 10
 
+# Offline chain simulator (see simulation.py)
+SIMULATION_POLICY = "cluster"
+SIMULATION_OUTPUT = Path(__file__).parent / "simulations.jsonl"
+
+# Coordinator policy played by the bots in `psynet test` ("random", "cluster" or "fixed", see policies.py)
+BOT_POLICY = "cluster"
+
+# Timing spans and counters of the hot paths (see instrumentation.py), also enabled by SRH_PN_METRICS=1.
+# Files are written to METRICS_DIR (None = system temp dir) every METRICS_FLUSH_SECONDS
+METRICS_ENABLED = False
+METRICS_DIR = None
+METRICS_FLUSH_SECONDS = 10
+
+# Profiling of the timeline requests (see profiling.py), overridden by config.txt and SRH_PN_PROFILE* variables.
+# Keeps the profiles of a SAMPLE_RATE fraction of the requests and of those slower than THRESHOLD_MS (None = off)
+PROFILE_ENABLED = False
+PROFILE_SAMPLE_RATE = 0.01
+PROFILE_THRESHOLD_MS = None
+PROFILE_DIR = None
+
+# HTTP load harness (see load_test.py)
+LOAD_TEST_URL = "http://localhost:5000"
+LOAD_TEST_MAX_PAGES = 200
+
+# Micro-benchmarks (see benchmarks.py): stored baseline, and the slowdown allowed before
+# test_benchmarks.py fails (0.5 = 50% slower), overridden by the BENCHMARK_TOLERANCE environment variable.
+# Operations of a few microseconds are noisy, so a slowdown below BENCHMARK_FLOOR_SECONDS always passes.
+BENCHMARK_BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+BENCHMARK_TOLERANCE = 0.5
+BENCHMARK_FLOOR_SECONDS = 0.0005
+
+# Memory budgets in bytes (see memory_accounting.py): the most each object may keep alive
+# before test_memory.py fails. Worker memory is about the sum over its concurrent pages.
+MEMORY_BUDGETS = {
+    "coordinator_trial_pages": 96 * 1024,
+    "positioning_control[png]": 32 * 1024,
+    "positioning_control[coins]": 8 * 1024,
+    "node_definition": 8 * 1024,
+    "world_from_definition": 4 * 1024,
+    "forager_positions_store": 4 * 1024,
+    # One map of the default world: shared by the pages of a worker (see RENDER_CACHE_MEMORY_BYTES)
+    "render_cache_map": 4608 * 1024,
+}
+
+# Version of the serialized World stored in node definitions
+WORLD_FORMAT_VERSION = 1
+
+# Pregenerated worlds used for the start nodes (see world_library.py)
+WORLD_LIBRARY_PATH = Path(__file__).parent / "worlds"
+WORLD_LIBRARY_VERSION = 1
+
+# Render engine used for the coordinator map ("numpy" or the "matplotlib" reference)
+RENDER_BACKEND = "numpy"
+
+# Pixels per grid cell in the rendered map
+CELL_SIZE = 10
+
+# Dots per inch of the rendered map: as with matplotlib's OffsetImage, a sprite is drawn
+# at coin_zoom * RENDER_DPI / 72 times its native size (and may then spill over its cell)
+RENDER_DPI = 100
+
+# Render cache: in-process LRU budget, shared on-disk budget and location (None = system temp dir)
+RENDER_CACHE_MEMORY_BYTES = 64 * 2**20
+RENDER_CACHE_DISK_BYTES = 2**30
+RENDER_CACHE_DIR = None
+RENDER_CACHE_INVESTMENT_STEPS = 100
+RENDER_CACHE_ENCODED_ENTRIES = 256
+
+# Render worker processes per web worker process (0 = render in the web worker itself, see render_workers.py),
+# how long a page waits for its map before showing a placeholder, and the most jobs queued at once
+RENDER_WORKERS = 2
+RENDER_TIMEOUT_SECONDS = 2.0
+RENDER_MAX_PENDING = 8
+# How the render processes are started: never "fork", as a forked child may inherit a lock held by
+# another thread of the web worker (e.g. the logging or precompute threads) and hang on it
+RENDER_START_METHOD = "forkserver"
+
+# Background rendering of the next coordinator's maps when a node is summarized (see precompute.py):
+# investment levels rendered (every PRECOMPUTE_SLIDER_STEPS steps of the investment slider, including the full
+# map that the maps of the other steps are composited from), and the most worlds waiting in a process before
+# further ones are skipped
+PRECOMPUTE_ENABLED = True
+PRECOMPUTE_SLIDER_STEPS = 10
+PRECOMPUTE_INVESTMENTS = [i / SLIDER_STEPS for i in range(0, SLIDER_STEPS + 1, PRECOMPUTE_SLIDER_STEPS)]
+PRECOMPUTE_MAX_PENDING = 8
+
+# How the coordinator map reaches the browser:
+#  "png"   - rendered on the server and sent as a compressed image
+#  "coins" - only the visible coin cells are sent and the browser draws them
+MAP_TRANSPORT = "png"
+
 IMAGE_PATHS = {
     "img_url": "static/positioning.png",
     "map_url": "static/map.png",
@@ -0,0 +1,116 @@
+# Module with the scheduler forming coordinator + forager groups across the parallel chains
+#
+# Every head node of a chain is played by a group of 1 coordinator (creator) and NUM_FORAGERS foragers
+# (raters), and a chain only grows once its group is complete. Each arriving participant is sent to the
+# chain whose group it brings closest to completion: the group with the fewest open slots, and among those
+# the one that has been waiting the longest. Foragers are never sent to a group whose coordinator has
+# not finished yet; when no chain can take the participant, they wait instead of leaving.
+# Metrics (see instrumentation.py):
+#   group_scheduler.waiting       - gauge of the participants waiting for a group (sum it across processes)
+#   group_scheduler.open_groups   - gauge of the groups that could take the last participant scheduled
+#   group_scheduler.blocked_groups - gauge of the groups waiting for their coordinator
+#   group_scheduler.wait          - span of the time from a participant's first wait to their assignment
+#   group_scheduler.assignments   - counter of the participants assigned, per role
+
+##########################################################################################
+# Imports
+##########################################################################################
+import time
+import threading
+
+from typing import Any, Dict, List, Tuple, Union
+
+from psynet.utils import get_logger
+
+from .instrumentation import METRICS
+
+logger = get_logger()
+
+###########################################
+# Scheduler
+###########################################
+
+# Participant variable holding the time of the participant's first wait for a group
+WAIT_STARTED_VARIABLE = "group_wait_started"
+
+
+class GroupScheduler:
+    """Orders the candidate chains of a participant for a create-and-rate trial maker.
+
+    Called by the trial maker's find_networks and prioritize_networks: begin() before the
+    search, prioritize() on the candidate chains, and resolve() on the outcome.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def begin(self) -> None:
+        self._local.blocked = 0
+
+    def count_creations(self, trial_maker: Any, node_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+        """(non-failed, finalized) creator trials per node, in one query."""
+        creator_class = trial_maker.creator_class
+        rows = (
+            creator_class.query
+            .with_entities(creator_class.node_id, creator_class.finalized)
+            .filter(creator_class.node_id.in_(node_ids), creator_class.failed.is_(False))
+            .all()
+        )
+        counts = {node_id: (0, 0) for node_id in node_ids}
+        for node_id, finalized in rows:
+            created, finished = counts[node_id]
+            counts[node_id] = (created + 1, finished + int(bool(finalized)))
+        return counts
+
+    def prioritize(self, trial_maker: Any, networks: List[Any], participant: Any) -> List[Any]:
+        if len(networks) == 0:
+            return networks
+        counts = self.count_creations(trial_maker, [network.head.id for network in networks])
+
+        open_networks = []
+        blocked = 0
+        for network in networks:
+            created, finished = counts[network.head.id]
+            if created >= trial_maker.n_creators and finished < created:
+                # The foragers can only start once the coordinator has positioned them
+                blocked += 1
+                continue
+            open_slots = trial_maker.trials_per_node - network.n_viable_trials_at_head
+            open_networks.append((open_slots, network.head.creation_time, network))
+        open_networks.sort(key=lambda x: (x[0], x[1]))
+
+        self._local.blocked = blocked
+        METRICS.gauge("group_scheduler.open_groups", len(open_networks))
+        METRICS.gauge("group_scheduler.blocked_groups", blocked)
+        logger.info(
+            f"Group scheduler: {len(open_networks)} open and {blocked} blocked group(s) for participant {participant.id}."
+        )
+        return [network for _, _, network in open_networks]
+
+    def resolve(
+        self,
+        outcome: Union[str, List[Any]],
+        participant: Any,
+        wait_for_networks: bool,
+    ) -> Union[str, List[Any]]:
+        """Turns an exit caused by blocked groups into a wait, and records the waits and assignments."""
+        if outcome == "exit" and getattr(self._local, "blocked", 0) > 0 and wait_for_networks:
+            outcome = "wait"
+
+        wait_started = participant.var.get(WAIT_STARTED_VARIABLE, None)
+        if outcome == "wait":
+            if wait_started is None:
+                participant.var.set(WAIT_STARTED_VARIABLE, time.time())
+                METRICS.gauge("group_scheduler.waiting", 1, add=True)
+        elif wait_started is not None:
+            participant.var.set(WAIT_STARTED_VARIABLE, None)
+            METRICS.gauge("group_scheduler.waiting", -1, add=True)
+            if outcome != "exit":
+                METRICS.observe("group_scheduler.wait", time.time() - wait_started)
+        return outcome
+
+    def record_assignment(self, role: str) -> None:
+        METRICS.count(f"group_scheduler.assignments.{role}")
+
+
+GROUP_SCHEDULER = GroupScheduler()
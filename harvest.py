@@ -0,0 +1,80 @@
+# Module with the harvest engine that splits the coins among the foragers
+
+##########################################################################################
+# Imports
+##########################################################################################
+import numpy as np
+
+from numpy.typing import NDArray
+from typing import Any, Iterable, Union
+
+from .game_parameters import (
+    HARVEST_RADIUS,
+    HARVEST_RULE,
+    HARVEST_CHUNK_SIZE,
+)
+
+###########################################
+# Harvest engine
+###########################################
+
+HARVEST_RULES = ["independent", "nearest", "split"]
+
+
+def harvest(
+    positions: Union[Iterable[Iterable[float]], NDArray[np.float64]],
+    coins: NDArray[np.integer],
+    radius: float = HARVEST_RADIUS,
+    rule: str = HARVEST_RULE,
+    chunk_size: int = HARVEST_CHUNK_SIZE,
+) -> NDArray[np.float64]:
+    """Coins taken by each forager, for all the foragers in one pass.
+
+    Args:
+        :param positions: (f, 2) array of (row, col) forager positions.
+        :param coins: (n, 2) array of (row, col) coin cells. Distances are taken to the cell centers.
+        :param radius: Foragers only reach the coins within this radius.
+        :param rule: How coins within reach of several foragers are shared:
+            'independent' - every forager within reach takes the coin (no competition),
+            'nearest' - the nearest forager takes the coin (Voronoi assignment, ties go to the lowest id),
+            'split' - the coin is split evenly among the foragers within reach.
+        :param chunk_size: Coins per block of the (chunk, f) distance matrix, to bound memory.
+    """
+    assert(rule in HARVEST_RULES), f"Invalid harvest rule: {rule}. Expected one of {HARVEST_RULES}."
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    centers = np.asarray(coins, dtype=np.float64).reshape(-1, 2) + 0.5
+    takes = np.zeros(len(positions), dtype=np.float64)
+    if len(positions) == 0:
+        return takes
+
+    for start in range(0, len(centers), chunk_size):
+        chunk = centers[start:start + chunk_size]
+        offsets = chunk[:, None, :] - positions[None, :, :]
+        distances = np.einsum("cfk,cfk->cf", offsets, offsets)
+        in_reach = distances <= radius ** 2
+        if rule == "independent":
+            takes += in_reach.sum(axis=0)
+        elif rule == "nearest":
+            reached = in_reach.any(axis=1)
+            winners = np.argmin(distances[reached], axis=1)
+            takes += np.bincount(winners, minlength=len(positions))
+        else:
+            n_reaching = in_reach.sum(axis=1, keepdims=True)
+            shares = np.divide(in_reach, n_reaching, out=np.zeros(in_reach.shape), where=n_reaching > 0)
+            takes += shares.sum(axis=0)
+    return takes
+
+
+def harvest_world(
+    world: Any,
+    positions: Union[Iterable[Iterable[float]], NDArray[np.float64]],
+    radius: float = HARVEST_RADIUS,
+    rule: str = HARVEST_RULE,
+    chunk_size: int = HARVEST_CHUNK_SIZE,
+) -> NDArray[np.float64]:
+    """Same as harvest, restricted with the world's spatial index to the coins within reach of some forager."""
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    index = world.spatial_index()
+    reached = [index.query_radius(position, radius) for position in positions]
+    candidates = np.unique(np.concatenate(reached)) if reached else np.zeros(0, dtype=np.intp)
+    return harvest(positions, world.coins[candidates], radius, rule, chunk_size)
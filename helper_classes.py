@@ -1,11 +1,12 @@
 # Helper classes to be used in the experiment
+import base64
+import hashlib
 import numpy as np
 import matplotlib.pyplot as plt
 
 from pathlib import Path
 from numpy.typing import NDArray
-from matplotlib.offsetbox import AnnotationBbox, OffsetImage
-from typing import List, Tuple, Optional, Iterable, Union, Any
+from typing import List, Tuple, Dict, Optional, Iterable, Union, Any
 
 from psynet.utils import get_logger
 
@@ -15,8 +16,16 @@ from .game_parameters import (
     NUM_FORAGERS,
     POWER_ROLE,
     INITIAL_WEALTH,
+    RENDER_BACKEND,
+    WORLD_FORMAT_VERSION,
+    MAX_PLACEMENT_ROUNDS,
+    OVAL_ASPECT,
     RNG,
 )
+from .render_engine import RENDER_BACKENDS
+from .spatial_index import CoinIndex
+from .harvest import harvest_world
+from .contract import contract_payoffs
 
 
 class SliderValues:
@@ -99,7 +108,12 @@ class SliderValues:
 
 
 class ForagerPositions:
-    """Keeps track of forager positions"""
+    """Keeps track of forager positions
+
+    Unclaimed forager ids are kept in a free list, so that a claim is O(1): a random entry is
+    swapped with the last one and popped. Claims are only safe for concurrent foragers through
+    claim_forager_position (see forager_slots.py), which holds a database row lock around them.
+    """
     forager_positions: List[Tuple[Union[int, float], Union[int, float]]] = []
     forager_queue: List[Tuple[int, Tuple[Union[int, float], Union[int, float]]]] = []
     _rng = RNG
@@ -107,6 +121,7 @@ class ForagerPositions:
     def __init__(self) -> None:
         self.forager_positions = []
         self.forager_queue = []
+        self.free_ids = []
         self.trial_assignments = dict()
 
     def add_forager_position(self, position:Tuple[Union[int, float], Union[int, float]]) -> None:
@@ -119,23 +134,23 @@ class ForagerPositions:
         assert(forager_id <= NUM_FORAGERS)
         self.forager_positions.append(position)
         self.forager_queue.append((forager_id, position))
+        self.free_ids.append(forager_id)
 
     def get_forager_position(self, trial_id:int) -> Tuple[int, Tuple[float, float]]:
-        logger.info(f"{self.trial_assignments}")
         if str(trial_id) not in self.trial_assignments.keys():
-            assert(len(self.forager_queue) > 0), f"Error: Trial {trial_id} is attempting to get forager position from empty forager queue."
-            next_id = self.get_next_id()
-            forager_id, position = self.forager_queue[next_id]
+            assert(len(self.free_ids) > 0), f"Error: Trial {trial_id} is attempting to get forager position from empty forager queue."
+            forager_id = self.get_next_id()
+            position = self.forager_positions[forager_id]
             self.trial_assignments[str(trial_id)] = (forager_id, position)
         else:
             forager_id, position = self.trial_assignments[str(trial_id)]
         return forager_id, position
 
     def get_next_id(self) -> int:
-        ids_taken = [forager_id for forager_id, _ in self.trial_assignments.values()]
-        all_ids = [forager_id for forager_id, _ in self.forager_queue]
-        available_ids = [forager_id for forager_id in all_ids if forager_id not in ids_taken]
-        return self._rng.choice(available_ids)
+        """Claims a random free forager id."""
+        i = int(self._rng.integers(len(self.free_ids)))
+        self.free_ids[i], self.free_ids[-1] = self.free_ids[-1], self.free_ids[i]
+        return self.free_ids.pop()
 
     def __str__(self) -> str:
         print_out = f"Trial assignments:"
@@ -145,11 +160,9 @@ class ForagerPositions:
             print_out += "\n"
         for trial_id, (forager_id, position) in self.trial_assignments.items():
             print_out += f"\t{trial_id} -> id:{forager_id} at:{position}\n"
-        ids_taken = [id_ for id_, _ in self.trial_assignments.values()]
-        print_out += f"Positions left: {len(self.forager_queue) - len(ids_taken)}\n"
-        for forager_id, position in self.forager_queue:
-            if forager_id not in ids_taken:
-                print_out += f"\t{forager_id} -> {position}\n"
+        print_out += f"Positions left: {len(self.free_ids)}\n"
+        for forager_id in sorted(self.free_ids):
+            print_out += f"\t{forager_id} -> {self.forager_positions[forager_id]}\n"
         return print_out
 
     def __len__(self) -> int:
@@ -159,7 +172,8 @@ class ForagerPositions:
 class World:
     """2D grid world with coins placed according to a distribution.
 
-    Grid cells contain 1 if a coin is present, otherwise 0.
+    Coins are stored sparsely as an (n, 2) int16 array of (row, col) cells.
+    The dense grid (1 if a coin is present, otherwise 0) is only built on demand.
     """
     width: Optional[int] = 100
     height: Optional[int] = 100
@@ -175,62 +189,207 @@ class World:
         num_centroids: int,
         distribution: str,
         dispersion: float,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        seed: Optional[int] = None,
     ) -> None:
+        if seed is not None:
+            # A seeded world is reproducible and independent of the shared RNG
+            self._rng = np.random.default_rng(seed)
         self.num_coins = num_coins
         self.num_centroids = num_centroids
         assert(distribution in ["linear", "circular", "oval"]), f"Dispersion {distribution} not supported. Choose from ['linear', 'circular', 'oval']."
         self.distribution = distribution
         assert(dispersion > 0), f"Dispersion must be greater than 0 (but got {dispersion})."
         self.dispersion = dispersion
+        if width is not None:
+            self.width = width
+        if height is not None:
+            self.height = height
         if self.width <= 0 or self.height <= 0:
             raise ValueError("width and height must be positive.")
+        if max(self.width, self.height) > np.iinfo(np.int16).max:
+            raise ValueError(f"width and height cannot exceed {np.iinfo(np.int16).max}.")
         if self.num_coins < 0:
             raise ValueError("num_coins must be non-negative.")
         if self.num_coins > self.width * self.height / 10:
             raise ValueError(f"num_coins cannot exceed {int(self.width * self.height / 10)} (but got {self.num_coins})")
-        self.grid = np.zeros((self.width, self.height))
+        self.coins = np.zeros((0, 2), dtype=np.int16)
         self._place_coins()
 
+    @property
+    def grid(self) -> NDArray[np.uint8]:
+        """Dense (height, width) grid with 1 where a coin is present."""
+        grid = np.zeros((self.height, self.width), dtype=np.uint8)
+        grid[self.coins[:, 0], self.coins[:, 1]] = 1
+        return grid
+
     def coin_positions(self) -> List[Tuple[int, int]]:
         """List of (row, col) positions where coins are present."""
-        coords_x, coords_y = np.where(self.grid == 1)
-        coin_positions = list(zip(coords_x.tolist(), coords_y.tolist()))
-        return coin_positions
+        return [tuple(cell) for cell in self.coins.tolist()]
 
     def count_coins(self) -> int:
         """Return the number of coins currently placed."""
-        return self.grid.sum()
+        return len(self.coins)
+
+    def spatial_index(self) -> CoinIndex:
+        """Bucket index over the current coins, built on first use."""
+        index = getattr(self, "_spatial_index", None)
+        if index is None or index.coins is not self.coins:
+            index = CoinIndex(self.coins)
+            self._spatial_index = index
+        return index
+
+    def coins_within(self, position: Tuple[float, float], radius: float) -> int:
+        """Number of coins within the radius of a (row, col) position."""
+        return len(self.spatial_index().query_radius(position, radius))
+
+    def nearest_coins(self, position: Tuple[float, float], k: int) -> NDArray[np.int16]:
+        """(row, col) cells of the k coins nearest to a position, closest first."""
+        return self.coins[self.spatial_index().nearest(position, k)]
+
+    def digest(self) -> str:
+        """Hash of the world content (size and coin cells)."""
+        content = hashlib.sha1(f"{self.width}x{self.height}".encode())
+        content.update(self.coins.astype(np.int64).tobytes())
+        return content.hexdigest()
+
+    def render_seed(self) -> int:
+        """Seed derived from the world content, so that renders of a world are reproducible."""
+        return int(self.digest()[:8], 16)
+
+    def reveal_thresholds(self) -> NDArray[np.float64]:
+        """Fixed per-coin thresholds in [0, 1): a coin is shown when its threshold is below the investment.
+
+        They are drawn once from the world content, so any higher investment shows a superset of the coins
+        of a lower one, and every process computes the same thresholds without storing them in the node.
+        """
+        thresholds = getattr(self, "_reveal_thresholds", None)
+        if thresholds is None or self._threshold_coins is not self.coins:
+            thresholds = np.random.default_rng(self.render_seed()).random(len(self.coins))
+            self._reveal_thresholds = thresholds
+            self._threshold_coins = self.coins
+        return thresholds
 
     def clear(self) -> None:
-        """Remove all coins (set all cells to 0)."""
-        self.grid = np.zeros((self.width, self.height))
+        """Remove all coins."""
+        self.coins = np.zeros((0, 2), dtype=np.int16)
+
+    def set_coins(self, cells: Iterable[Iterable[int]]) -> None:
+        """Replace the coins with the given (row, col) cells.
+
+        Cells outside the grid are dropped and duplicated cells are merged.
+        """
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        inside = (
+            (cells[:, 0] >= 0) & (cells[:, 0] < self.height)
+            & (cells[:, 1] >= 0) & (cells[:, 1] < self.width)
+        )
+        # Unique (row, col) cells in row-major order
+        flat = np.unique(cells[inside, 0] * self.width + cells[inside, 1])
+        self.coins = np.stack([flat // self.width, flat % self.width], axis=1).astype(np.int16)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact, versioned representation of the world to be stored in node definitions."""
+        return {
+            "version": WORLD_FORMAT_VERSION,
+            "width": int(self.width),
+            "height": int(self.height),
+            "num_coins": int(self.num_coins),
+            "num_centroids": int(self.num_centroids),
+            "distribution": self.distribution,
+            "dispersion": float(self.dispersion),
+            "coins": base64.b64encode(self.coins.astype("<i2").tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "World":
+        """Rebuild a world from the output of to_dict, without sampling any coins."""
+        version = data.get("version")
+        if version != WORLD_FORMAT_VERSION:
+            raise ValueError(f"Unsupported world format version: {version}. Expected {WORLD_FORMAT_VERSION}.")
+        coins = np.frombuffer(base64.b64decode(data["coins"]), dtype="<i2")
+        return cls.from_coins(
+            coins=coins.reshape(-1, 2),
+            width=data["width"],
+            height=data["height"],
+            num_centroids=data["num_centroids"],
+            distribution=data["distribution"],
+            dispersion=data["dispersion"],
+        )
+
+    @classmethod
+    def from_coins(
+        cls,
+        coins: NDArray[np.integer],
+        width: int,
+        height: int,
+        num_centroids: int,
+        distribution: str,
+        dispersion: float,
+    ) -> "World":
+        """Build a world around already placed (row, col) coin cells."""
+        world = cls.__new__(cls)
+        world.width = int(width)
+        world.height = int(height)
+        world.num_coins = len(coins)
+        world.num_centroids = int(num_centroids)
+        world.distribution = distribution
+        world.dispersion = float(dispersion)
+        world.coins = np.asarray(coins, dtype=np.int16).reshape(-1, 2)
+        return world
 
     def _place_coins(self) -> None:
-        """Dispatch to the chosen distribution strategy."""
+        """Place exactly num_coins coins around the centroids.
+
+        All the missing coins are sampled in one batch per round: samples are clipped to the grid,
+        collisions (with placed coins or within the batch) are discarded and resampled in the next round.
+        If a round places less than half of its samples, the covariances are inflated for the next rounds,
+        so that very concentrated clusters still reach the exact count.
+        """
         self.clear()
         if self.num_coins == 0:
             return
 
-        coins_per_centroid = self.num_coins // self.num_centroids
-        offset = self.count_coins() - coins_per_centroid * self.num_centroids
-        coins_per_centroid = [coins_per_centroid for _ in range(self.num_centroids)]
-        if offset > 0:
-            coins_per_centroid[-1] += offset
-
-        centroids = self.get_centroids()
-        for i, (x, y) in enumerate(centroids):
-            n_coins = coins_per_centroid[i]
-            sample_coins = self.sample_bivariate_normal(
-                mean=(x, y),
-                cov=((self.dispersion, 0), (0, self.dispersion)),
-                n=n_coins,
-            )
-            coords_x = [int(x) for x, y in sample_coins]
-            coords_y = [int(y) for x, y in sample_coins]
-            self.grid[coords_x, coords_y] = 1
+        coins_per_centroid = np.full(self.num_centroids, self.num_coins // self.num_centroids)
+        offset = self.num_coins - coins_per_centroid.sum()
+        coins_per_centroid[-1] += offset
+
+        means = np.asarray(self.get_centroids(), dtype=float)
+        chols = np.linalg.cholesky(self.get_covariances())
+        taken = np.zeros(self.width * self.height, dtype=bool)
+        placed = []
+        missing = coins_per_centroid
+        scale = 1.0
+        for _ in range(MAX_PLACEMENT_ROUNDS):
+            if missing.sum() == 0:
+                break
+            # Centroid of each sample in the batch
+            owners = np.repeat(np.arange(self.num_centroids), missing)
+            noise = self._rng.standard_normal((len(owners), 2))
+            samples = means[owners] + scale * np.einsum("nij,nj->ni", chols[owners], noise)
+            # Sampled (x, y) points land in the (row=y, col=x) cell, clipped to the grid
+            cols = np.clip(np.floor(samples[:, 0]), 0, self.width - 1).astype(np.int64)
+            rows = np.clip(np.floor(samples[:, 1]), 0, self.height - 1).astype(np.int64)
+            flat = rows * self.width + cols
+            # Keep the first sample of each free cell
+            keep = np.zeros(len(flat), dtype=bool)
+            keep[np.unique(flat, return_index=True)[1]] = True
+            keep &= ~taken[flat]
+            taken[flat[keep]] = True
+            placed.append(flat[keep])
+            missing = missing - np.bincount(owners[keep], minlength=self.num_centroids)
+            if keep.sum() < len(owners) / 2:
+                scale *= 1.25
+        else:
+            if missing.sum() > 0:
+                raise RuntimeError(f"Could not place {missing.sum()} coins after {MAX_PLACEMENT_ROUNDS} rounds.")
+
+        flat = np.sort(np.concatenate(placed))
+        self.coins = np.stack([flat // self.width, flat % self.width], axis=1).astype(np.int16)
 
     def get_centroids(self) -> List[Tuple[int, int]]:
-        """Return the centroids of coins placed."""
+        """Return the (x, y) centroids of coins placed."""
         if self.num_centroids == 1:
             return [(int(self.width / 2), int(self.height / 2))]
 
@@ -239,91 +398,109 @@ class World:
             sample = [(int(x * self.width), int(x * self.height)) for x in sample]
             return sample
 
-        elif self.distribution == "circular":
+        elif self.distribution in ["circular", "oval"]:
             sample = np.linspace(0, 1, self.num_centroids + 1)[:-1]
             theta = (2.0 * np.pi) * sample
             x = np.cos(theta).tolist()
             y = np.sin(theta).tolist()
             sample = list(zip(x, y))
 
-            x_scale = 0.25 * self.width
-            y_scale = 0.25 * self.height
+            if self.distribution == "circular":
+                x_scale = 0.25 * self.width
+                y_scale = 0.25 * self.height
+            else:
+                # Centroids on an ellipse elongated along the width
+                x_scale = 0.35 * self.width
+                y_scale = 0.2 * self.height
             sample = [(x * x_scale, y * y_scale) for x, y in sample]
             sample = [(x + 0.5 * self.width, y + 0.5 * self.height) for x, y in sample]
             sample = [(int(x), int(y)) for x, y in sample]
             return sample
 
-        elif self.distribution == "oval":
-            raise NotImplementedError("oval dispersion is not yet implemented.")
-
         else:
             raise NotImplementedError(f"Dispersion {self.distribution} not supported. Choose from ['linear', 'circular', 'oval'].")
 
+    def get_covariances(self) -> NDArray[np.float64]:
+        """Return the (num_centroids, 2, 2) covariance matrices of the coins around each centroid.
+
+        The 'oval' distribution uses anisotropic clusters with variances dispersion * OVAL_ASPECT
+        and dispersion / OVAL_ASPECT, elongated along the tangent of the ellipse of centroids.
+        """
+        isotropic = self.dispersion * np.eye(2)
+        if self.distribution != "oval":
+            return np.repeat(isotropic[None], self.num_centroids, axis=0)
+        theta = (2.0 * np.pi) * np.linspace(0, 1, self.num_centroids + 1)[:-1]
+        if self.num_centroids == 1:
+            theta = np.zeros(1)
+        # Tangent of the ellipse (x = a cos t, y = b sin t) at each centroid
+        tangent = np.stack([-0.35 * self.width * np.sin(theta), 0.2 * self.height * np.cos(theta)], axis=1)
+        tangent /= np.linalg.norm(tangent, axis=1, keepdims=True)
+        normal = np.stack([-tangent[:, 1], tangent[:, 0]], axis=1)
+        variances = self.dispersion * np.array([OVAL_ASPECT, 1 / OVAL_ASPECT])
+        # Sum of variance * outer(direction, direction) over the two principal directions
+        return (
+            variances[0] * tangent[:, :, None] * tangent[:, None, :]
+            + variances[1] * normal[:, :, None] * normal[:, None, :]
+        )
+
     def __str__(self) -> str:
         """ASCII representation: '1' for coin, '.' for empty."""
+        grid = self.grid
         lines = []
         for r in range(self.height):
-            line = "".join("1" if self.grid[r][c] else "." for c in range(self.width))
+            line = "".join("1" if grid[r][c] else "." for c in range(self.width))
             lines.append(line)
         return "\n".join(lines)
 
+    def visible_coins(
+        self,
+        coin_percentage: Optional[float] = 1,
+        seed: Optional[int] = None,
+    ) -> NDArray[np.int16]:
+        """(row, col) cells of the coins shown for the given investment, as an (n, 2) int16 array.
+
+        By default the coins shown are those whose reveal threshold is below the investment.
+        If a seed is given, the visibility of all coins is instead drawn from it in one vectorized step.
+        """
+        if seed is None:
+            visible = self.reveal_thresholds() < coin_percentage
+        else:
+            visible = np.random.default_rng(seed).random(len(self.coins)) < coin_percentage
+        return self.coins[visible]
+
     def render(
         self,
         show: bool = False,
         coin_zoom: float = 0.1,
         coin_percentage: Optional[float] = 1,
+        backend: str = RENDER_BACKEND,
+        seed: Optional[int] = None,
     ) -> NDArray[np.uint8]:
         """Render the world by drawing coin images at coin positions.
 
         Args:
             :param coin_zoom: Relative size of the coin inside a cell (0<zoom<=1).
             :param show: If True, also display the figure.
-            :param coin_percentage: Probability of drawing a coin.
+            :param coin_percentage: Investment, the coins whose reveal threshold is below it are drawn.
+            :param backend: Render engine, 'numpy' (default) or 'matplotlib' (reference).
+            :param seed: If given, the coins shown are drawn from the seed instead of the reveal thresholds.
         """
         if not (0 < coin_zoom <= 1.0):
             raise ValueError("coin_zoom must be in (0, 1].")
-
-        # Canvas sized roughly to grid, independent of DPI
-        fig, ax = plt.subplots(
-            figsize=(self.width / 10, self.height / 10),
-            dpi=100
+        if backend not in RENDER_BACKENDS:
+            raise ValueError(f"Render backend {backend} not supported. Choose from {list(RENDER_BACKENDS.keys())}.")
+
+        img = RENDER_BACKENDS[backend](
+            width=self.width,
+            height=self.height,
+            cells=self.visible_coins(coin_percentage, seed),
+            coin_path=self.coin_path,
+            coin_zoom=coin_zoom,
         )
 
-        # Light cell grid
-        ax.set_xticks(np.arange(-.5, self.width, 1), minor=True)
-        ax.set_yticks(np.arange(-.5, self.height, 1), minor=True)
-        ax.set_xticks([])
-        ax.set_yticks([])
-        ax.set_aspect("equal")
-        ax.set_title("World", pad=8)
-        ax.set_axis_off()
-
-        # Load coin image (RGBA supported)
-        raw_coin_img = plt.imread(self.coin_path)
-        coin_img = OffsetImage(raw_coin_img, zoom=coin_zoom)
-
-        # Place the coin image centered in each occupied cell
-        half = 0.5 * coin_zoom
-        coins = self.coin_positions()
-        for (r, c) in coins:
-            if self._rng.random() < coin_percentage:
-                coin_img.image.axes = ax
-                ab = AnnotationBbox(
-                    coin_img,
-                    (c + half, r + half),
-                    frameon=False
-                )
-                ax.add_artist(ab)
-
-        # Render the figure to a buffer
-        fig.canvas.draw()
-        # Convert to a NumPy array (RGBA)
-        img = np.frombuffer(fig.canvas.buffer_rgba(), dtype=np.uint8)
-        img = img.reshape(fig.canvas.get_width_height()[::-1] + (4,))  # (H, W, 4)
-
         if show:
+            plt.imshow(img)
             plt.show()
-        plt.close(fig)
 
         return img
 
@@ -371,52 +548,52 @@ class WealthTracker:
         self.coordinator_wealth: Union[float, None] = None
         self.foragers_wealth: Union[List[float], None] = None
 
-    def update_from_trials(self, trials: List[Any], slider: SliderValues) -> None:
+    def update_from_trials(self, trials: List[Any], slider: SliderValues, world: "World") -> None:
         forager_trials = [t for t in trials if 'forager' in str(t).lower()]
         assert len(forager_trials) == self.num_foragers
+        coordinator_trial = [t for t in trials if 'coordinator' in str(t).lower()]
+        assert len(coordinator_trial) == 1, f"{[str(t) for t in trials]}"
+        positions = coordinator_trial[0].answer['custom_front_end_to_position_foragers']
+        assert isinstance(positions, ForagerPositions)
+
+        # Get forager production in previous episode, ordered by forager id
+        foragers_payoffs = self.get_coins_from_foragers(forager_trials, positions, world)
+        productions = np.zeros(self.num_foragers)
+        productions[[t.var.forager_id for t in forager_trials]] = foragers_payoffs
+        self.update_from_production(productions, slider)
+
+    def update_from_production(self, productions: NDArray[np.float64], slider: SliderValues) -> None:
+        """Split the coins produced by each forager according to the contract set by the sliders."""
+        assert len(productions) == self.num_foragers
+        self.n_coins = float(np.sum(productions))
+        coordinator, foragers = contract_payoffs(
+            overhead=slider.get_overhead(),
+            wages=slider.get_wages_commission(),
+            prerogative=slider.get_coordinator_prerogative(),
+            productions=productions,
+        )
+        self.coordinator_wealth = float(coordinator[0, 0])
+        self.foragers_wealth = foragers[0, 0].tolist()
 
-        # Get forager production in previous episode
-        foragers_payoffs = self.get_coins_from_foragers(forager_trials)
-        self.n_coins = sum(foragers_payoffs)
-        foragers_proportions = np.array(foragers_payoffs) / self.n_coins
-
-        # Get slider parameters
-        overhead = slider.get_overhead()
-        wages = slider.get_wages_commission()
-
-        # Calculate coordinator's wealth
-        self.coordinator_wealth = overhead * self.n_coins
-        remaining = self.n_coins - self.coordinator_wealth
-
-        # Calculate foragers' wealth
-        wages = remaining * wages
-        remaining = remaining - wages
-        foragers_split = foragers_proportions * remaining
-        self.foragers_wealth = foragers_split + wages
-
-    def get_coins_from_foragers(self, trials: List[Any]) -> NDArray[np.float64]:
+    def get_coins_from_foragers(
+        self,
+        trials: List[Any],
+        positions: ForagerPositions,
+        world: "World",
+    ) -> NDArray[np.float64]:
+        """Coins harvested by the forager of each trial, with competition among all the foragers."""
+        takes = harvest_world(world, positions.forager_positions)
         foragers_payoffs = []
         for trial in trials:
-            answers = self.get_coins(trial)
+            answers = takes[trial.var.forager_id]
             logger.info(f"{str(trial)} => {answers}")
             foragers_payoffs.append(answers)
         return np.array(foragers_payoffs)
 
-    def get_coins(self, trial: Any) -> int:
-        logger.info(f"{hasattr(trial, "vars['coins_foraged']")}")
-        return 10
-
     def initialize(self, slider: SliderValues) -> None:
-        # Get slider parameters
-        overhead = slider.get_overhead()
-        wages = slider.get_wages_commission() # <= MUST USE BELOW
-
-        # Calculate coordinator's wealth
-        self.coordinator_wealth = overhead * self.n_coins
-        remaining = self.n_coins - self.coordinator_wealth
-
-        # Calculate foragers' wealth
-        self.foragers_wealth = [remaining / self.num_foragers] * self.num_foragers # <= MUST INCLUDE WAGES
+        """Split n_coins as if every forager had produced the same amount."""
+        productions = np.full(self.num_foragers, self.n_coins / self.num_foragers)
+        self.update_from_production(productions, slider)
 
     def get_coordinator_wealth(self) -> float:
         assert(self.coordinator_wealth is not None), "Coordinator wealth is not set yet. Run update() first."
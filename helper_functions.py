@@ -6,12 +6,15 @@
 
 from typing import List, Any, Tuple
 
-import psynet
+import numpy as np
+import psynet.experiment
+from psynet.participant import Participant
 from psynet.utils import get_logger
 
 from .helper_classes import (
     World,
-    SliderValues
+    SliderValues,
+    RewardProcessing,
 )
 
 logger = get_logger()
@@ -20,9 +23,26 @@ logger = get_logger()
 # Helper functions
 ###########################################
 
+def from_legacy_world(world: World) -> World:
+    """Rebuild a World pickled before the sparse coins, from its dense grid of coins."""
+    grid = world.__dict__['grid']
+    return World.from_coins(
+        coins=np.argwhere(grid == 1),
+        width=grid.shape[1],
+        height=grid.shape[0],
+        num_centroids=world.num_centroids,
+        distribution=world.distribution,
+        dispersion=world.dispersion,
+    )
+
+
 def get_world_wealth_slider_from_node(node: Any) -> Tuple[World, SliderValues, int]:
-    # Extract world
+    # Extract world (older definitions hold the World object itself, with a dense grid before the sparse coins)
     world = node.definition['world']
+    if not isinstance(world, World):
+        world = World.from_dict(world)
+    elif 'coins' not in world.__dict__:
+        world = from_legacy_world(world)
     # Extract wealth
     wealth = node.definition['wealth']
     # Extract slider values
@@ -33,23 +53,30 @@ def get_world_wealth_slider_from_node(node: Any) -> Tuple[World, SliderValues, i
     # Return values
     return world, world_slider, wealth
 
+
+def get_reward_text_from_node(node: Any, wealth: int, slider: SliderValues, trial_type: str) -> str:
+    # Reward texts precomputed when the node was grown (start nodes have none)
+    reward_texts = node.definition.get('reward_texts') or dict()
+    if trial_type in reward_texts:
+        return reward_texts[trial_type]
+    return RewardProcessing.get_reward_text(n_coins=wealth, slider=slider, trial_type=trial_type)
+
 def get_list_participants_ids(
         experiment: psynet.experiment.Experiment, 
         participant: psynet.participant.Participant
     ) -> List[int]:
     
-    # Get previous participant's ids
-    participants_id = []
-    for id in range(1, participant.id):
-        try:
-            p = experiment.get_participant_from_participant_id(id)
-            if not p.failed:
-                participants_id.append(id)
-        except:
-            pass
-            logger.info(f"Id {id} is not valid!")
-
-    logger.info(f"Participants: {participants_id}")
+    # Get previous participant's ids, with one query on the (indexed) primary key
+    rows = (
+        Participant.query
+        .with_entities(Participant.id)
+        .filter(Participant.id < participant.id, Participant.failed.is_(False))
+        .order_by(Participant.id)
+        .all()
+    )
+    participants_id = [id for id, in rows]
+
+    logger.info(f"Participants before {participant.id}: {len(participants_id)}")
 
     return participants_id
 
@@ -0,0 +1,189 @@
+# Module with the timing spans and counters of the hot paths
+#
+# Off by default. Switch it on with METRICS_ENABLED in game_parameters.py or the SRH_PN_METRICS=1
+# environment variable. Each process then writes, every METRICS_FLUSH_SECONDS, to METRICS_DIR:
+#   metrics-<pid>.prom   - current totals in Prometheus text format (e.g. for the node_exporter textfile collector)
+#   metrics-<pid>.jsonl  - one snapshot of the totals per flush
+
+##########################################################################################
+# Imports
+##########################################################################################
+import os
+import json
+import time
+import tempfile
+import threading
+import functools
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from psynet.utils import get_logger
+
+from .game_parameters import (
+    METRICS_ENABLED,
+    METRICS_DIR,
+    METRICS_FLUSH_SECONDS,
+)
+
+logger = get_logger()
+
+###########################################
+# Metrics
+###########################################
+
+class _NullSpan:
+    """Span used while the metrics are disabled: entering and leaving it does nothing."""
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, metrics: "Metrics", name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+
+
+class Metrics:
+    """Named timing spans and counters, aggregated in the process and flushed to local files.
+
+    Spans keep count, total and max seconds, counters keep a running total and gauges a current value.
+    While disabled, span() returns a shared no-op context manager and count() returns at once.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = METRICS_ENABLED,
+        directory: Optional[Union[str, Path]] = METRICS_DIR,
+        flush_seconds: float = METRICS_FLUSH_SECONDS,
+    ) -> None:
+        if directory is None:
+            directory = Path(tempfile.gettempdir()) / "srh_pn_metrics"
+        self.enabled = enabled or os.environ.get("SRH_PN_METRICS", "") not in ["", "0"]
+        self.directory = Path(directory)
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.reset()
+
+    def reset(self) -> None:
+        self.counters: Dict[str, float] = dict()
+        self.gauges: Dict[str, float] = dict()
+        self.spans: Dict[str, Dict[str, float]] = dict()
+
+    def span(self, name: str) -> Union[_Span, _NullSpan]:
+        """Context manager timing the enclosed block under the given name."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def timed(self, name: str) -> Callable:
+        """Decorator timing every call of the function under the given name."""
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs) -> Any:
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with _Span(self, name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        self._maybe_flush()
+
+    def gauge(self, name: str, value: float, add: bool = False) -> None:
+        """Set the gauge to the value, or with add, move it by the value (e.g. +1/-1 for a queue)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[name] = self.gauges.get(name, 0) + value if add else value
+        self._maybe_flush()
+
+    def observe(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                span = self.spans[name] = {"count": 0, "sum": 0.0, "max": 0.0}
+            span["count"] += 1
+            span["sum"] += seconds
+            span["max"] = max(span["max"], seconds)
+        self._maybe_flush()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "time": time.time(),
+                "pid": os.getpid(),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "spans": {name: dict(span) for name, span in self.spans.items()},
+            }
+
+    def to_prometheus(self, snapshot: Optional[Dict[str, Any]] = None) -> str:
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        pid = snapshot["pid"]
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"srh_pn_{_metric_name(name)}_total"
+            lines += [f"# TYPE {metric} counter", f'{metric}{{pid="{pid}"}} {value}']
+        for name, value in sorted(snapshot["gauges"].items()):
+            metric = f"srh_pn_{_metric_name(name)}"
+            lines += [f"# TYPE {metric} gauge", f'{metric}{{pid="{pid}"}} {value}']
+        if snapshot["spans"]:
+            lines += ["# TYPE srh_pn_span_seconds summary", "# TYPE srh_pn_span_seconds_max gauge"]
+        for name, span in sorted(snapshot["spans"].items()):
+            labels = f'span="{name}",pid="{pid}"'
+            lines += [
+                f"srh_pn_span_seconds_count{{{labels}}} {span['count']}",
+                f"srh_pn_span_seconds_sum{{{labels}}} {span['sum']:.6f}",
+                f"srh_pn_span_seconds_max{{{labels}}} {span['max']:.6f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        """Write the current totals to this process's Prometheus and JSONL files."""
+        snapshot = self.snapshot()
+        self._last_flush = time.monotonic()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            prom_path = self.directory / f"metrics-{snapshot['pid']}.prom"
+            # Scrapers must never see a half-written file
+            tmp_path = prom_path.with_suffix(".prom.tmp")
+            tmp_path.write_text(self.to_prometheus(snapshot))
+            os.replace(tmp_path, prom_path)
+            with open(self.directory / f"metrics-{snapshot['pid']}.jsonl", "a") as f:
+                f.write(json.dumps(snapshot) + "\n")
+        except OSError as e:
+            logger.info(f"Could not write the metrics to {self.directory}: {e}")
+
+    def _maybe_flush(self) -> None:
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+METRICS = Metrics()
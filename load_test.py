@@ -0,0 +1,219 @@
+# Module with the HTTP load harness
+#
+# Drives concurrent groups of simulated participants (one coordinator and NUM_FORAGERS foragers each)
+# through the timeline of a running local server, and reports latency percentiles per page type.
+# Launch the experiment and the harness together in Docker with:
+#   bash docker/load-test --groups 10
+
+##########################################################################################
+# Imports
+##########################################################################################
+import re
+import json
+import time
+import uuid
+import argparse
+import requests
+import numpy as np
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple
+
+from .policies import to_slider
+from .game_parameters import (
+    NUM_FORAGERS,
+    STAGE_SIZE,
+    FORAGER_ICON_SIZE,
+    LOAD_TEST_URL,
+    LOAD_TEST_MAX_PAGES,
+)
+
+###########################################
+# Simulated participant
+###########################################
+
+END_MARKERS = ["the end of the experiment", "UnsuccessfulEndLogic", "RejectedConsentLogic"]
+PAGE_UUID = re.compile(r'"pageUuid":\s*"([^"]+)"')
+PUSH_BUTTON = re.compile(r'class="btn push-button[^"]*"\s*id="([^"]*)"')
+
+
+def page_kind(html: str, page_type: str) -> str:
+    """Coarse type of a timeline page, used to choose the answer and to group the latencies."""
+    if page_type == "WaitPage":
+        return "wait"
+    if any(marker in html for marker in END_MARKERS):
+        return "end"
+    if 'class="stage"' in html:
+        return "positioning"
+    if 'type="range"' in html:
+        return "slider"
+    if "push-button" in html:
+        return "push_button"
+    return "info"
+
+
+class SimulatedParticipant:
+    """One participant walking through the timeline over HTTP, as a browser would."""
+
+    def __init__(self, base_url: str, rng: np.random.Generator, max_pages: int = LOAD_TEST_MAX_PAGES) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.rng = rng
+        self.max_pages = max_pages
+        self.session = requests.Session()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.completed = False
+
+    def _request(self, method: str, url: str, **kwargs) -> Tuple[requests.Response, float]:
+        start = time.perf_counter()
+        response = self.session.request(method, self.base_url + url, **kwargs)
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        return response, elapsed
+
+    def join(self) -> Tuple[int, str]:
+        worker_id = uuid.uuid4().hex[:12]
+        assignment_id = uuid.uuid4().hex[:12]
+        response, elapsed = self._request(
+            "POST",
+            f"/participant/{worker_id}/load-test/{assignment_id}/debug",
+            params={"recruiter": "hotair"},
+        )
+        self.latencies["POST participant"].append(elapsed)
+        participant = response.json()["participant"]
+        return participant["id"], participant["unique_id"]
+
+    def answer(self, kind: str, html: str) -> Any:
+        if kind == "positioning":
+            # Icons are placed by their (left, top) pixel offset, see PositioningControl.stage_to_world
+            offsets = self.rng.uniform(0, STAGE_SIZE - FORAGER_ICON_SIZE, size=(NUM_FORAGERS, 2))
+            return {str(i): [float(left), float(top)] for i, (left, top) in enumerate(offsets)}
+        if kind == "slider":
+            return to_slider(self.rng.random())
+        if kind in ["push_button", "end"]:
+            buttons = PUSH_BUTTON.findall(html)
+            return buttons[0] if buttons else None
+        return None
+
+    def run(self) -> "SimulatedParticipant":
+        participant_id, unique_id = self.join()
+        page_type = None
+        for _ in range(self.max_pages):
+            response, elapsed = self._request("GET", "/timeline", params={"unique_id": unique_id})
+            html = response.text
+            kind = page_kind(html, page_type)
+            self.latencies[f"GET {kind}"].append(elapsed)
+            if kind == "wait":
+                time.sleep(1)
+            page_uuid = PAGE_UUID.search(html)
+            assert(page_uuid is not None), f"No page uuid on the {kind} page of participant {participant_id}."
+            submission = {
+                "participant_id": participant_id,
+                "page_uuid": page_uuid.group(1),
+                "raw_answer": self.answer(kind, html),
+                "metadata": {"time_taken": 0},
+            }
+            response, elapsed = self._request("POST", "/response", data={"json": json.dumps(submission)})
+            self.latencies[f"POST {kind}"].append(elapsed)
+            if kind == "end":
+                self.completed = True
+                break
+            page_type = response.json().get("page", {}).get("attributes", {}).get("type")
+        return self
+
+
+###########################################
+# Load test
+###########################################
+
+def run_load_test(
+    base_url: str = LOAD_TEST_URL,
+    groups: int = 1,
+    seed: int = 0,
+    max_pages: int = LOAD_TEST_MAX_PAGES,
+) -> Dict[str, Any]:
+    """Run groups * (1 + NUM_FORAGERS) participants at once and summarize the latencies and throughput."""
+    n_participants = groups * (1 + NUM_FORAGERS)
+    participants = [
+        SimulatedParticipant(base_url, np.random.default_rng([seed, i]), max_pages)
+        for i in range(n_participants)
+    ]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_participants) as executor:
+        futures = [executor.submit(participant.run) for participant in participants]
+        errors = [repr(future.exception()) for future in futures if future.exception() is not None]
+    elapsed = time.perf_counter() - start
+
+    latencies = defaultdict(list)
+    for participant in participants:
+        for key, values in participant.latencies.items():
+            latencies[key] += values
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "participants": n_participants,
+        "completed": sum(participant.completed for participant in participants),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "requests_per_s": len(all_latencies) / elapsed,
+        "participants_per_min": 60 * sum(participant.completed for participant in participants) / elapsed,
+        "latency_ms": {
+            key: summarize_latencies(values)
+            for key, values in sorted(latencies.items()) + [("all", all_latencies)]
+        },
+    }
+
+
+def summarize_latencies(values: List[float]) -> Dict[str, float]:
+    values = 1000 * np.asarray(values)
+    return {
+        "n": len(values),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def wait_for_server(base_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            requests.get(base_url.rstrip("/") + "/start", timeout=5)
+            return
+        except requests.ConnectionError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test a local deployment with concurrent simulated groups.")
+    parser.add_argument("--url", type=str, default=LOAD_TEST_URL)
+    parser.add_argument("--groups", type=int, nargs="+", default=[1], help="Concurrent groups (one run per value).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-pages", type=int, default=LOAD_TEST_MAX_PAGES)
+    parser.add_argument("--wait-for-server", type=float, default=0, help="Seconds to wait for the server to come up.")
+    parser.add_argument("--out", type=str, default=None, help="Optional JSON file for the full report.")
+    args = parser.parse_args()
+
+    if args.wait_for_server > 0:
+        wait_for_server(args.url, args.wait_for_server)
+
+    reports = []
+    for groups in args.groups:
+        report = run_load_test(args.url, groups, args.seed, args.max_pages)
+        reports.append({"groups": groups, **report})
+        print(f"\n{groups} group(s): {report['completed']}/{report['participants']} participants completed "
+              f"in {report['elapsed_s']:.1f} s, {report['requests_per_s']:.1f} requests/s, "
+              f"{len(report['errors'])} error(s)")
+        print(f"{'page':<24}{'n':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for key, summary in report["latency_ms"].items():
+            print(f"{key:<24}{summary['n']:>6}{summary['p50']:>10.1f}{summary['p90']:>10.1f}{summary['p99']:>10.1f}{summary['max']:>10.1f}")
+
+    if args.out is not None:
+        with open(args.out, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Script to measure the size and serialization time of the coordinator map payload
+#
+# Run from the directory above the experiment, e.g. in Docker:
+#   bash docker/run bash -c "cd / && python -m experiment.map_payload"
+
+##########################################################################################
+# Imports
+##########################################################################################
+import time
+import argparse
+
+from pathlib import Path
+from typing import Dict
+
+from .helper_classes import World
+from .render_engine import encode_png, png_data_url
+from .game_parameters import (
+    NUM_COINS,
+    NUM_CENTROIDS,
+    DISPERSION,
+    IMAGE_PATHS,
+)
+
+###########################################
+# Measurement
+###########################################
+
+def measure_map_payload(
+    world: World,
+    investment: float,
+    coin_zoom: float,
+    repeats: int = 3,
+) -> Dict[str, Dict[str, float]]:
+    """Compare the nested-list payload with the PNG data URL for one rendered map.
+
+    Returns, for each transport, the payload size in bytes and the best serialization time in seconds.
+    """
+    img = world.render(show=False, coin_percentage=investment, coin_zoom=coin_zoom)
+
+    def best_of(serialize):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            payload = serialize()
+            times.append(time.perf_counter() - start)
+        return len(payload.encode()), min(times)
+
+    list_bytes, list_seconds = best_of(lambda: str(img.tolist()))
+    png_bytes, png_seconds = best_of(lambda: png_data_url(encode_png(img)))
+    return {
+        "nested_list": {"bytes": list_bytes, "seconds": list_seconds},
+        "png_data_url": {"bytes": png_bytes, "seconds": png_seconds},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the coordinator map payload.")
+    parser.add_argument("--investment", type=float, default=0.5)
+    parser.add_argument("--distribution", type=str, default="linear")
+    args = parser.parse_args()
+
+    world = World(
+        num_coins=NUM_COINS,
+        num_centroids=NUM_CENTROIDS,
+        distribution=args.distribution,
+        dispersion=DISPERSION,
+    )
+    world.coin_path = Path(__file__).parent / IMAGE_PATHS["coin_url"]
+    results = measure_map_payload(world, args.investment, coin_zoom=1 / NUM_COINS)
+    for transport, result in results.items():
+        print(f"{transport:>14}: {result['bytes']:>12,d} bytes  {1000 * result['seconds']:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
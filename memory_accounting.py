@@ -0,0 +1,161 @@
+# Module with the memory accounting of the per-page and per-node objects
+#
+# Reports the bytes that each trial page and node definition keeps alive, and each map kept by the
+# render cache shared by the pages of a worker, measured with tracemalloc:
+#   bash docker/run bash -c "cd / && python -m experiment.memory_accounting"
+# test_memory.py checks the same probes against MEMORY_BUDGETS.
+
+##########################################################################################
+# Imports
+##########################################################################################
+import gc
+import json
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+from copy import deepcopy
+from itertools import count
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Tuple
+
+from .helper_classes import World
+from .coordinator_classes import CoordinatorTrial
+from .custom_front_end import PositioningControl
+from .render_cache import RenderCache
+from .benchmarks import (
+    make_world,
+    make_positions,
+    make_node,
+)
+from .game_parameters import (
+    IMAGE_PATHS,
+    NUM_COINS,
+    NUM_FORAGERS,
+    MEMORY_BUDGETS,
+    RENDER_CACHE_MEMORY_BYTES,
+)
+
+###########################################
+# Measurement
+###########################################
+
+def measure_allocation(build: Callable[[], Any], warm_up: bool = True) -> Tuple[int, int]:
+    """(retained, peak) bytes allocated by build(), while its result is still alive.
+
+    Retained bytes are what a live page or definition costs a worker, peak bytes what building it
+    needs on top. With warm_up, build() runs once first so that shared caches (assets, render cache)
+    are not charged to the measured call: the render cache is measured on its own by render_cache_map.
+    """
+    previous = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        if warm_up:
+            build()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            result = build()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del result
+        return current - baseline, peak - baseline
+    finally:
+        logging.disable(previous)
+
+###########################################
+# Probes
+###########################################
+
+def coordinator_trial_pages() -> Any:
+    """Pages of one coordinator trial, built from its origin node as show_trial does."""
+    world = make_world()
+    trial = SimpleNamespace(origin=make_node(world), context=IMAGE_PATHS, time_estimate=CoordinatorTrial.time_estimate)
+    return lambda: CoordinatorTrial.show_trial(trial, None, None)
+
+
+def positioning_control(mode: str) -> Any:
+    world = make_world()
+    return lambda: PositioningControl(world=world, investment=0.5, mode=mode)
+
+
+def node_definition() -> Any:
+    # As loaded back from the database
+    serialized = json.dumps(make_node(make_world()).definition)
+    return lambda: json.loads(serialized)
+
+
+def world_from_definition() -> Any:
+    data = make_node(make_world()).definition["world"]
+    return lambda: World.from_dict(data)
+
+
+def forager_positions_store() -> Any:
+    # Decoded from the node vars on every forager claim (see forager_slots.py)
+    positions = make_positions(make_world())
+    for trial_id in range(NUM_FORAGERS):
+        positions.get_forager_position(trial_id)
+    store = {"1": positions}
+    return lambda: deepcopy(store)
+
+
+def render_cache_map() -> Any:
+    # A map (array and PNG) kept by the render cache: shared by the pages of a worker, up to RENDER_CACHE_MEMORY_BYTES
+    # Without a disk tier, so that only the memory tier is measured
+    cache = RenderCache(disk_bytes=0, cache_dir=tempfile.mkdtemp(prefix="memory_accounting_"))
+    seeds = count()
+
+    def build() -> RenderCache:
+        world = make_world(seed=next(seeds))
+        cache.get_png(world=world, investment=1, coin_zoom=1 / NUM_COINS, timeout=None)
+        return cache
+
+    return build
+
+
+# Each probe builds its fixtures once and returns the builder of the object to measure
+MEMORY_PROBES: Dict[str, Callable[[], Callable[[], Any]]] = {
+    "coordinator_trial_pages": coordinator_trial_pages,
+    "positioning_control[png]": lambda: positioning_control("png"),
+    "positioning_control[coins]": lambda: positioning_control("coins"),
+    "node_definition": node_definition,
+    "world_from_definition": world_from_definition,
+    "forager_positions_store": forager_positions_store,
+    "render_cache_map": render_cache_map,
+}
+
+
+def run_probes() -> Dict[str, Tuple[int, int]]:
+    return {name: measure_allocation(probe()) for name, probe in MEMORY_PROBES.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bytes kept alive by the per-page and per-node objects.")
+    parser.add_argument("--workers-concurrency", type=int, default=None,
+                        help="Also estimate the memory of this many concurrent coordinators in one worker.")
+    args = parser.parse_args()
+
+    results = run_probes()
+    print(f"{'object':<32}{'retained (KiB)':>16}{'peak (KiB)':>14}{'budget (KiB)':>14}")
+    for name, (retained, peak) in results.items():
+        budget = MEMORY_BUDGETS.get(name)
+        budget = f"{budget / 1024:>14.1f}" if budget is not None else f"{'-':>14}"
+        print(f"{name:<32}{retained / 1024:>16.1f}{peak / 1024:>14.1f}{budget}")
+
+    if args.workers_concurrency:
+        # A coordinator holds its pages, a positioning control and the world decoded from its node
+        per_coordinator = sum(results[name][0] for name in ["coordinator_trial_pages", "positioning_control[png]", "world_from_definition"])
+        print(f"\n{args.workers_concurrency} concurrent coordinators: ~{args.workers_concurrency * per_coordinator / 2**20:.1f} MiB")
+        # Their maps are shared through the render cache, whose arrays are capped per worker
+        per_map = results["render_cache_map"][0]
+        maps = min(args.workers_concurrency, RENDER_CACHE_MEMORY_BYTES // max(1, per_map))
+        print(f"Render cache: ~{maps * per_map / 2**20:.1f} MiB for {maps} map(s) of {per_map / 2**20:.1f} MiB "
+              f"(capped at {RENDER_CACHE_MEMORY_BYTES / 2**20:.0f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
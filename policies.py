@@ -0,0 +1,144 @@
+# Module with the coordinator policies used by the simulator and the bots
+
+##########################################################################################
+# Imports
+##########################################################################################
+import numpy as np
+
+from numpy.typing import NDArray
+from typing import List, Tuple, Dict, Type
+
+from .spatial_index import CoinIndex
+from .game_parameters import (
+    NUM_FORAGERS,
+    HARVEST_RADIUS,
+    STARTING_OVERHEAD,
+    SLIDER_STEPS,
+    BOT_POLICY,
+)
+
+###########################################
+# Policies
+###########################################
+
+def to_slider(value: float) -> float:
+    """Round a value in [0, 1] to a position the page sliders can take."""
+    return float(np.round(np.clip(value, 0, 1) * SLIDER_STEPS) / SLIDER_STEPS)
+
+
+class Policy:
+    """Decisions of the coordinator in one iteration of the game.
+
+    The world is passed in for the layout only: policies must act on the visible coins,
+    which is all the coordinator sees. All randomness comes from the given rng,
+    so that a simulation is reproducible from its seed.
+    """
+    name = "base"
+
+    def choose_investment(self, world, wealth: float, rng: np.random.Generator) -> float:
+        raise NotImplementedError
+
+    def place_foragers(
+        self,
+        world,
+        visible: NDArray[np.integer],
+        rng: np.random.Generator,
+        num_foragers: int = NUM_FORAGERS,
+    ) -> List[Tuple[float, float]]:
+        """(row, col) position of each forager, given the (n, 2) visible coin cells."""
+        raise NotImplementedError
+
+    def choose_overhead(self, overhead: float, wealth: float, rng: np.random.Generator) -> float:
+        raise NotImplementedError
+
+    @staticmethod
+    def random_positions(world, rng: np.random.Generator, num_foragers: int) -> List[Tuple[float, float]]:
+        rows = rng.uniform(0, world.height, num_foragers)
+        cols = rng.uniform(0, world.width, num_foragers)
+        return [(float(row), float(col)) for row, col in zip(rows, cols)]
+
+
+class RandomPolicy(Policy):
+    """Uniformly random investment, positions and overhead."""
+    name = "random"
+
+    def choose_investment(self, world, wealth, rng):
+        return to_slider(rng.random())
+
+    def place_foragers(self, world, visible, rng, num_foragers=NUM_FORAGERS):
+        return self.random_positions(world, rng, num_foragers)
+
+    def choose_overhead(self, overhead, wealth, rng):
+        return to_slider(rng.random())
+
+
+class ClusterSeekingPolicy(Policy):
+    """Invests a fixed share and places the foragers greedily on the densest visible clusters.
+
+    Each forager goes to the visible coin that has the most not yet covered visible coins within
+    the harvest radius. The overhead is left unchanged.
+    """
+    name = "cluster"
+
+    def __init__(self, investment: float = 0.5, radius: float = HARVEST_RADIUS) -> None:
+        self.investment = to_slider(investment)
+        self.radius = radius
+
+    def choose_investment(self, world, wealth, rng):
+        return self.investment
+
+    def place_foragers(self, world, visible, rng, num_foragers=NUM_FORAGERS):
+        visible = np.asarray(visible).reshape(-1, 2)
+        if len(visible) == 0:
+            return self.random_positions(world, rng, num_foragers)
+        index = CoinIndex(visible)
+        centers = visible.astype(np.float64) + 0.5
+        neighbours = [index.query_radius(center, self.radius) for center in centers]
+        covered = np.zeros(len(visible), dtype=bool)
+        positions = []
+        for _ in range(num_foragers):
+            gains = np.array([np.count_nonzero(~covered[n]) for n in neighbours])
+            best = int(np.argmax(gains))
+            covered[neighbours[best]] = True
+            positions.append((float(centers[best, 0]), float(centers[best, 1])))
+        return positions
+
+    def choose_overhead(self, overhead, wealth, rng):
+        return to_slider(overhead)
+
+
+class FixedContractPolicy(ClusterSeekingPolicy):
+    """Cluster-seeking coordinator that always sets the same overhead."""
+    name = "fixed"
+
+    def __init__(
+        self,
+        overhead: float = STARTING_OVERHEAD,
+        investment: float = 0.5,
+        radius: float = HARVEST_RADIUS,
+    ) -> None:
+        super().__init__(investment=investment, radius=radius)
+        self.overhead = to_slider(overhead)
+
+    def choose_overhead(self, overhead, wealth, rng):
+        return self.overhead
+
+
+POLICIES: Dict[str, Type[Policy]] = {
+    policy.name: policy for policy in [RandomPolicy, ClusterSeekingPolicy, FixedContractPolicy]
+}
+
+
+def get_policy(name: str, **kwargs) -> Policy:
+    assert(name in POLICIES), f"Invalid policy: {name}. Expected one of {list(POLICIES)}."
+    return POLICIES[name](**kwargs)
+
+
+def get_bot_policy() -> Policy:
+    """Policy played by the PsyNet bots (see BOT_POLICY)."""
+    return get_policy(BOT_POLICY)
+
+
+def bot_rng(bot) -> np.random.Generator:
+    """Random generator for a bot's answer to its current page, reproducible across test runs."""
+    return np.random.default_rng([bot.id, bot.page_count])
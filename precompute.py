@@ -0,0 +1,121 @@
+# Module with the background precomputation of the next coordinator's maps
+#
+# When a node is summarized, the world of the next node is already known. A background worker of the
+# process then renders its coordinator map for PRECOMPUTE_INVESTMENTS into the render cache, whose disk tier
+# keeps their PNG encodings for all the web workers, so that the next coordinator's positioning page costs
+# a cache lookup in whichever worker serves it.
+# The reward texts of the next node are cheap and computed on the spot (see reward_texts below).
+
+##########################################################################################
+# Imports
+##########################################################################################
+import threading
+
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from psynet.utils import get_logger
+
+from .helper_classes import World, SliderValues, RewardProcessing
+from .render_cache import RENDER_CACHE
+from .instrumentation import METRICS
+from .game_parameters import (
+    NUM_COINS,
+    NUM_FORAGERS,
+    MAP_TRANSPORT,
+    PRECOMPUTE_ENABLED,
+    PRECOMPUTE_INVESTMENTS,
+    PRECOMPUTE_MAX_PENDING,
+)
+
+logger = get_logger()
+
+###########################################
+# Reward texts
+###########################################
+
+def reward_texts(wealth: int, slider: SliderValues) -> Dict[str, str]:
+    """Reward texts of every role, to be stored in the definition of the node they are shown on."""
+    trial_types = ["coordinator"] + [f"forager-{i}" for i in range(NUM_FORAGERS)]
+    return {
+        trial_type: RewardProcessing.get_reward_text(n_coins=wealth, slider=slider, trial_type=trial_type)
+        for trial_type in trial_types
+    }
+
+###########################################
+# Map precomputation
+###########################################
+
+class MapPrecomputer:
+    """Renders coordinator maps in a background thread, one world at a time.
+
+    At most max_pending worlds wait for their renders: when the worker falls behind,
+    further worlds are skipped and their maps are rendered on demand as before.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = PRECOMPUTE_ENABLED,
+        investments: List[float] = PRECOMPUTE_INVESTMENTS,
+        max_pending: int = PRECOMPUTE_MAX_PENDING,
+    ) -> None:
+        self.enabled = enabled and MAP_TRANSPORT == "png"
+        self.investments = investments
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Future] = dict()
+        self._lock = threading.Lock()
+
+    def submit(self, world: World, coin_path: Path) -> Optional[Future]:
+        """Queue the renders of the world's coordinator maps. Returns None if skipped."""
+        if not self.enabled:
+            return None
+        world.coin_path = coin_path
+        digest = world.digest()
+        with self._lock:
+            if digest in self._pending:
+                return self._pending[digest]
+            if len(self._pending) >= self.max_pending:
+                METRICS.count("precompute.skipped")
+                logger.info(f"Precompute: {len(self._pending)} world(s) pending, skipping world {digest[:8]}.")
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precompute")
+            future = self._executor.submit(self._render, world)
+            self._pending[digest] = future
+        future.add_done_callback(lambda _: self._done(digest))
+        return future
+
+    def _render(self, world: World) -> None:
+        with METRICS.span("precompute.world"):
+            for investment in self.investments:
+                # No request waits on these, so they wait for as long as the render takes
+                RENDER_CACHE.get_png(world=world, investment=investment, coin_zoom=1 / NUM_COINS, timeout=None)
+        METRICS.count("precompute.worlds")
+
+    def _done(self, digest: str) -> None:
+        with self._lock:
+            future = self._pending.pop(digest, None)
+        if future is not None and future.exception() is not None:
+            logger.info(f"Precompute: rendering world {digest[:8]} failed ({future.exception()}).")
+
+    def wait(self) -> None:
+        """Block until every queued world has been rendered."""
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            future.exception()
+
+
+PRECOMPUTER = MapPrecomputer()
+
+
+def precompute_next_node(node: Any, seed: Dict[str, Any]) -> None:
+    """Start precomputing the coordinator maps of the node grown from the seed."""
+    if not PRECOMPUTER.enabled:
+        return
+    world = seed['world']
+    if not isinstance(world, World):
+        world = World.from_dict(world)
+    PRECOMPUTER.submit(world, Path(node.context["coin_url"]))
@@ -0,0 +1,212 @@
+# Module with the opt-in profiler of slow trial pages
+#
+# Off by default. Switch it on in config.txt (see the [Profiling] section) or with environment variables:
+#   SRH_PN_PROFILE=1                  - profile the timeline requests
+#   SRH_PN_PROFILE_SAMPLE_RATE=0.05   - keep a profile of this fraction of the requests
+#   SRH_PN_PROFILE_THRESHOLD_MS=500   - keep a profile of every request slower than this
+#   SRH_PN_PROFILE_DIR=/tmp/profiles  - where the .prof files go
+# The .prof files are cProfile/pstats dumps, which open as flame graphs in e.g. snakeviz.
+# Summarize the hotspots across all captured profiles with:
+#   bash docker/run bash -c "cd / && python -m experiment.profiling --top 30"
+
+##########################################################################################
+# Imports
+##########################################################################################
+import os
+import io
+import time
+import pstats
+import random
+import cProfile
+import argparse
+import tempfile
+import threading
+import functools
+
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from psynet.utils import get_logger
+
+from .game_parameters import (
+    PROFILE_ENABLED,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_THRESHOLD_MS,
+    PROFILE_DIR,
+)
+
+logger = get_logger()
+
+###########################################
+# Profiler
+###########################################
+
+# Settings, with the config.txt keys and environment variables that override them
+PROFILE_SETTINGS = {
+    "enabled": ("profile_enabled", "SRH_PN_PROFILE", bool),
+    "sample_rate": ("profile_sample_rate", "SRH_PN_PROFILE_SAMPLE_RATE", float),
+    "threshold_ms": ("profile_threshold_ms", "SRH_PN_PROFILE_THRESHOLD_MS", float),
+    "directory": ("profile_dir", "SRH_PN_PROFILE_DIR", str),
+}
+
+
+def register_profile_config(config: Any) -> None:
+    """Register the profiling keys so that config.txt may set them (called from extra_parameters)."""
+    for key, _, cast in PROFILE_SETTINGS.values():
+        config.register(key, cast)
+
+
+def _parse(value: str, cast: type) -> Any:
+    if cast is bool:
+        return value.strip().lower() in ["1", "true", "yes", "on"]
+    return cast(value)
+
+
+class Profiler:
+    """Profiles a sampled fraction of the requests, or all of them when a latency threshold is set.
+
+    A profile is kept if its request was sampled or took longer than the threshold.
+    Profiles do not nest: inside a profiled block, further profile() calls on the same thread do nothing.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = PROFILE_ENABLED,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        threshold_ms: Optional[float] = PROFILE_THRESHOLD_MS,
+        directory: Optional[Union[str, Path]] = PROFILE_DIR,
+    ) -> None:
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.threshold_ms = threshold_ms
+        self.directory = directory
+        self._configured = False
+        self._local = threading.local()
+
+    def configure(self) -> None:
+        """Apply the config.txt settings, then the environment variables, on top of the defaults.
+
+        Until the experiment config has been loaded, only the environment variables apply
+        and the config is tried again on the next call.
+        """
+        try:
+            from psynet.utils import get_config
+            config = get_config()
+            for attribute, (key, _, _) in PROFILE_SETTINGS.items():
+                value = config.get(key, None)
+                if value is not None:
+                    setattr(self, attribute, value)
+            self._configured = True
+        except Exception as e:
+            # e.g. offline use, where there is no experiment config to read
+            logger.debug(f"Profiler: config.txt settings not available ({e}).")
+        for attribute, (_, variable, cast) in PROFILE_SETTINGS.items():
+            if os.environ.get(variable):
+                setattr(self, attribute, _parse(os.environ[variable], cast))
+        if self.directory is None:
+            self.directory = Path(tempfile.gettempdir()) / "srh_pn_profiles"
+        self.directory = Path(self.directory)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        if not self._configured:
+            self.configure()
+        sampled = self.enabled and random.random() < self.sample_rate
+        thresholded = self.enabled and bool(self.threshold_ms)
+        if not (sampled or thresholded) or getattr(self._local, "active", False):
+            yield
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already running on this thread (Python 3.12+)
+            yield
+            return
+        self._local.active = True
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._local.active = False
+            elapsed_ms = 1000 * (time.perf_counter() - start)
+            if sampled or elapsed_ms >= self.threshold_ms:
+                self._save(profile, name, elapsed_ms)
+
+    def profiled(self, name: str) -> Callable:
+        """Decorator profiling the calls of the function under the given name."""
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs) -> Any:
+                with self.profile(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _save(self, profile: cProfile.Profile, name: str, elapsed_ms: float) -> None:
+        safe_name = "".join(c if c.isalnum() or c in "._-" else "_" for c in name)
+        path = self.directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{safe_name}-{elapsed_ms:.0f}ms.prof"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(path)
+        except OSError as e:
+            logger.info(f"Profiler: could not write {path}: {e}")
+
+
+PROFILER = Profiler()
+
+###########################################
+# Summary
+###########################################
+
+def summarize_profiles(
+    paths: List[Union[str, Path]],
+    top: int = 20,
+    sort: str = "cumulative",
+) -> str:
+    """Table of the top functions across all the given profiles, merged."""
+    paths = [str(path) for path in paths]
+    if not paths:
+        return "No profiles found."
+    out = io.StringIO()
+    stats = pstats.Stats(paths[0], stream=out)
+    for path in paths[1:]:
+        stats.add(path)
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    return out.getvalue()
+
+
+def count_profiles(paths: List[Union[str, Path]]) -> Dict[str, int]:
+    """Number of profiles per profiled name, from the file names."""
+    counts: Dict[str, int] = dict()
+    for path in paths:
+        # <date>-<time>-<pid>-<name>-<ms>ms.prof
+        name = Path(path).stem.split("-", 3)[3].rsplit("-", 1)[0]
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize the hotspots across the captured profiles.")
+    parser.add_argument("directory", type=str, nargs="?", default=None)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--sort", type=str, default="cumulative", choices=["cumulative", "tottime", "ncalls"])
+    parser.add_argument("--name", type=str, default=None, help="Only the profiles of this profiled name.")
+    args = parser.parse_args()
+
+    if args.directory is None:
+        PROFILER.configure()
+        args.directory = PROFILER.directory
+    paths = sorted(Path(args.directory).glob("*.prof"))
+    if args.name is not None:
+        paths = [path for path in paths if f"-{args.name}-" in path.name]
+    for name, count in sorted(count_profiles(paths).items()):
+        print(f"{count:>6} profile(s) of {name}")
+    print(summarize_profiles(paths, args.top, args.sort))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+# Module with the render cache for the coordinator maps
+
+##########################################################################################
+# Imports
+##########################################################################################
+import os
+import hashlib
+import tempfile
+import threading
+import numpy as np
+
+from pathlib import Path
+from collections import OrderedDict
+from numpy.typing import NDArray
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from psynet.utils import get_logger
+
+from .game_parameters import (
+    RENDER_BACKEND,
+    RENDER_CACHE_MEMORY_BYTES,
+    RENDER_CACHE_DISK_BYTES,
+    RENDER_CACHE_DIR,
+    RENDER_CACHE_INVESTMENT_STEPS,
+    RENDER_CACHE_ENCODED_ENTRIES,
+)
+from .render_engine import (
+    COMPOSITE_BACKENDS,
+    encode_png,
+    composite_cells,
+    render_placeholder,
+)
+from .render_workers import RENDER_POOL
+from .asset_registry import ASSETS
+from .instrumentation import METRICS
+
+logger = get_logger()
+
+###########################################
+# Render cache
+###########################################
+
+class RenderCache:
+    """Two-tier cache of rendered maps.
+
+    The first tier is a size-bounded LRU dictionary local to the process.
+    The second tier is a directory of .npy files, and of the PNG encodings of the maps served,
+    shared by all the web worker processes.
+    Entries are keyed by world content, quantized investment, coin zoom and seed.
+    The in-process tiers are guarded by a lock, as maps are also rendered in the background (see precompute.py).
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int = RENDER_CACHE_MEMORY_BYTES,
+        disk_bytes: int = RENDER_CACHE_DISK_BYTES,
+        cache_dir: Optional[Union[str, Path]] = RENDER_CACHE_DIR,
+        investment_steps: int = RENDER_CACHE_INVESTMENT_STEPS,
+        encoded_entries: int = RENDER_CACHE_ENCODED_ENTRIES,
+    ) -> None:
+        if cache_dir is None:
+            cache_dir = Path(tempfile.gettempdir()) / "srh_pn_render_cache"
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.cache_dir = Path(cache_dir)
+        self.investment_steps = investment_steps
+        self.encoded_entries = encoded_entries
+        self._encoded: OrderedDict[str, bytes] = OrderedDict()
+        self._memory: OrderedDict[str, NDArray[np.uint8]] = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.RLock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize_investment(self, investment: Union[float, str]) -> float:
+        """Round the investment to the resolution of the investment slider."""
+        steps = self.investment_steps
+        return round(float(investment) * steps) / steps
+
+    def make_key(
+        self,
+        world: Any,
+        investment: Union[float, str],
+        coin_zoom: float,
+        seed: int,
+        backend: str = RENDER_BACKEND,
+    ) -> str:
+        key = f"{world.digest()}|{self.quantize_investment(investment):.6f}|{coin_zoom:.6f}|{seed}|{backend}|{Path(world.coin_path).name}"
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[NDArray[np.uint8]]:
+        """Look the key up in memory, then on disk. Returns None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                METRICS.count("render_cache.memory_hits")
+                return self._memory[key]
+        path = self._disk_path(key)
+        try:
+            img = np.load(path, allow_pickle=False)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            METRICS.count("render_cache.misses")
+            return None
+        self.disk_hits += 1
+        METRICS.count("render_cache.disk_hits")
+        self._remember(key, img)
+        return img
+
+    def put(self, key: str, img: NDArray[np.uint8], persist: bool = True) -> None:
+        """Store the image in memory, and on disk if persist."""
+        self._remember(key, img)
+        if persist:
+            self._write_to_disk(key, ".npy", lambda f: np.save(f, img, allow_pickle=False))
+
+    def get_or_render(
+        self,
+        world: Any,
+        investment: Union[float, str],
+        coin_zoom: float,
+        seed: Optional[int] = None,
+        backend: str = RENDER_BACKEND,
+        timeout: Optional[float] = -1,
+    ) -> NDArray[np.uint8]:
+        """Return the cached map, rendering and storing it on a miss.
+
+        Renders go through the render pool: if the map is not ready within the timeout
+        (see RenderPool.render), a placeholder is returned and the map is cached once it is done.
+        """
+        img, _ = self._get_or_render(world, investment, coin_zoom, seed, backend, timeout)
+        return img
+
+    def get_png(
+        self,
+        world: Any,
+        investment: Union[float, str],
+        coin_zoom: float,
+        seed: Optional[int] = None,
+        backend: str = RENDER_BACKEND,
+        timeout: Optional[float] = -1,
+    ) -> bytes:
+        """Return the map encoded as PNG bytes, memoizing the (small) encoded payloads in memory and on disk."""
+        if seed is None:
+            seed = world.render_seed()
+        key = self.make_key(world, investment, coin_zoom, seed, backend)
+        with self._lock:
+            if key in self._encoded:
+                self._encoded.move_to_end(key)
+                self.memory_hits += 1
+                METRICS.count("render_cache.memory_hits")
+                return self._encoded[key]
+        # Encoded by another worker (or before a restart)
+        path = self._disk_path(key, ".png")
+        try:
+            png = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            png = None
+        if png is not None:
+            self.disk_hits += 1
+            METRICS.count("render_cache.disk_hits")
+            self._remember_png(key, png)
+            return png
+
+        img, complete = self._get_or_render(world, investment, coin_zoom, seed, backend, timeout)
+        png = encode_png(img)
+        if not complete:
+            return png
+        self._remember_png(key, png)
+        self._write_to_disk(key, ".png", lambda f: f.write(png))
+        return png
+
+    def _get_or_render(
+        self,
+        world: Any,
+        investment: Union[float, str],
+        coin_zoom: float,
+        seed: Optional[int],
+        backend: str,
+        timeout: Optional[float],
+    ) -> Tuple[NDArray[np.uint8], bool]:
+        """(map, False) if the map was not ready and a placeholder stands in for it, else (map, True).
+
+        With a composite backend only the map showing all the coins is rendered and cached:
+        the map of any lower investment is composited from it (see composite_cells).
+        """
+        if seed is None:
+            seed = world.render_seed()
+        coin_percentage = self.quantize_investment(investment)
+        if coin_percentage < 1 and backend in COMPOSITE_BACKENDS:
+            full, complete = self._get_or_render(world, 1, coin_zoom, seed, backend, timeout)
+            visible = world.visible_coins(coin_percentage, seed)
+            if not complete:
+                return render_placeholder(world.width, world.height, visible), False
+            with METRICS.span("world.composite"):
+                img = composite_cells(full, visible, world.coins, ASSETS.get_for_zoom(world.coin_path, coin_zoom))
+            return img, True
+
+        key = self.make_key(world, investment, coin_zoom, seed, backend)
+        img = self.get(key)
+        if img is not None:
+            return img, True
+        # Other workers get the PNG of a map from disk (see get_png): only the maps showing all the coins,
+        # which the others may be composited from, are worth their megabytes on disk
+        persist = coin_percentage == 1
+        with METRICS.span("world.render"):
+            img = RENDER_POOL.render(
+                world,
+                coin_percentage=coin_percentage,
+                coin_zoom=coin_zoom,
+                backend=backend,
+                seed=seed,
+                on_late=lambda late_img: self.put(key, late_img, persist),
+                timeout=timeout,
+            )
+        if img is None:
+            METRICS.count("render_placeholders")
+            placeholder = render_placeholder(world.width, world.height, world.visible_coins(coin_percentage, seed))
+            return placeholder, False
+        METRICS.count("renders")
+        self.put(key, img, persist)
+        return img, True
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one entry from both tiers, or every entry if no key is given."""
+        with self._lock:
+            if key is None:
+                self._encoded.clear()
+                self._memory.clear()
+                self._memory_used = 0
+                paths = self._disk_entries()
+            else:
+                self._encoded.pop(key, None)
+                img = self._memory.pop(key, None)
+                if img is not None:
+                    self._memory_used -= img.nbytes
+                paths = [self._disk_path(key), self._disk_path(key, ".png")]
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_used,
+            "encoded_entries": len(self._encoded),
+        }
+
+    def _disk_path(self, key: str, suffix: str = ".npy") -> Path:
+        return self.cache_dir / f"{key}{suffix}"
+
+    def _disk_entries(self) -> List[Path]:
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*.npy")) + list(self.cache_dir.glob("*.png"))
+
+    def _remember_png(self, key: str, png: bytes) -> None:
+        with self._lock:
+            self._encoded[key] = png
+            while len(self._encoded) > self.encoded_entries:
+                self._encoded.popitem(last=False)
+
+    def _remember(self, key: str, img: NDArray[np.uint8]) -> None:
+        if img.nbytes > self.memory_bytes:
+            return
+        # Cached maps are shared between pages, so they must not be modified in place
+        img.flags.writeable = False
+        with self._lock:
+            if key in self._memory:
+                self._memory_used -= self._memory.pop(key).nbytes
+            self._memory[key] = img
+            self._memory_used += img.nbytes
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= evicted.nbytes
+                self.evictions += 1
+
+    def _write_to_disk(self, key: str, suffix: str, write: Callable[[BinaryIO], Any]) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write under a unique name and rename, so other workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, self._disk_path(key, suffix))
+            self._evict_from_disk()
+        except OSError as e:
+            logger.info(f"Render cache: could not write {key} to disk ({e})")
+
+    def _evict_from_disk(self) -> None:
+        entries = []
+        for path in self._disk_entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        used = sum(size for _, size, _ in entries)
+        # Least recently used first (hits refresh the modification time)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if used <= self.disk_bytes:
+                break
+            try:
+                path.unlink()
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            used -= size
+
+
+RENDER_CACHE = RenderCache()
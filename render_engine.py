@@ -0,0 +1,256 @@
+# Module with the render engines used to draw the world map
+
+##########################################################################################
+# Imports
+##########################################################################################
+import io
+import base64
+import functools
+import numpy as np
+import matplotlib.pyplot as plt
+
+from pathlib import Path
+from numpy.typing import NDArray
+from PIL import Image
+from typing import Callable, Dict, Tuple, Union
+from matplotlib.offsetbox import AnnotationBbox, OffsetImage
+
+from .asset_registry import ASSETS
+from .game_parameters import CELL_SIZE, RENDER_DPI
+
+###########################################
+# Parameters
+###########################################
+
+BACKGROUND_COLOR = (255, 255, 255, 255)
+PLACEHOLDER_COIN_COLOR = (230, 180, 30, 255)
+
+###########################################
+# Canvas helpers
+###########################################
+
+def blank_canvas(width: int, height: int, cell_size: int = CELL_SIZE) -> NDArray[np.uint8]:
+    """Return an opaque (H, W, 4) canvas for a world of width x height cells."""
+    canvas = np.empty((height * cell_size, width * cell_size, 4), dtype=np.uint8)
+    canvas[...] = BACKGROUND_COLOR
+    return canvas
+
+
+@functools.lru_cache(maxsize=8)
+def background(width: int, height: int, cell_size: int = CELL_SIZE) -> NDArray[np.uint8]:
+    """Shared read-only blank canvas, to be copied before drawing on it."""
+    canvas = blank_canvas(width, height, cell_size)
+    canvas.flags.writeable = False
+    return canvas
+
+
+def patch_indices(
+    cells: NDArray[np.integer],
+    size: int,
+    shape: Tuple[int, int],
+    cell_size: int = CELL_SIZE,
+) -> Tuple[NDArray[np.intp], NDArray[np.intp]]:
+    """Pixel indices of the size x size patch centered on every cell, shape (n, size, 1) and (n, 1, size).
+
+    Indices past the edges of the canvas are clipped to them: these edge pixels belong to the patch anyway.
+    """
+    pad = (cell_size - size) // 2
+    span = np.arange(size)
+    rows = (cells[:, 0] * cell_size + pad)[:, None, None] + span[None, :, None]
+    cols = (cells[:, 1] * cell_size + pad)[:, None, None] + span[None, None, :]
+    return np.clip(rows, 0, shape[0] - 1), np.clip(cols, 0, shape[1] - 1)
+
+
+def dilate(grid: NDArray[np.bool_], radius: int) -> NDArray[np.bool_]:
+    """Cells within the given (Chebyshev) distance of a True cell."""
+    height, width = grid.shape
+    padded = np.pad(grid, radius)
+    dilated = np.zeros_like(grid)
+    for dr in range(2 * radius + 1):
+        for dc in range(2 * radius + 1):
+            dilated |= padded[dr:dr + height, dc:dc + width]
+    return dilated
+
+
+def composite_cells(
+    full: NDArray[np.uint8],
+    visible: NDArray[np.integer],
+    coins: NDArray[np.integer],
+    sprite: NDArray[np.float32],
+    cell_size: int = CELL_SIZE,
+) -> NDArray[np.uint8]:
+    """The render of just the visible coins, from the render of all the coins with the same sprite (see render_numpy).
+
+    The patch of a visible coin is copied from the full render, unless it overlaps the patch of a
+    hidden coin (sprites larger than a cell spill over their neighbours): such coins are drawn again,
+    with the visible coins overlapping them.
+    """
+    height, width = full.shape[0] // cell_size, full.shape[1] // cell_size
+    canvas = background(width, height, cell_size).copy()
+    visible = np.asarray(visible, dtype=np.intp).reshape(-1, 2)
+    if len(visible) == 0:
+        return canvas
+    size = sprite.shape[0]
+    # Patches of coins up to this many cells apart overlap
+    reach = -(-size // cell_size) - 1
+
+    shown = np.zeros((height, width), dtype=bool)
+    shown[visible[:, 0], visible[:, 1]] = True
+    hidden = np.zeros((height, width), dtype=bool)
+    coins = np.asarray(coins, dtype=np.intp).reshape(-1, 2)
+    hidden[coins[:, 0], coins[:, 1]] = True
+    hidden &= ~shown
+    redrawn = shown & dilate(hidden, reach)
+    clean = shown & ~redrawn
+
+    if redrawn.any():
+        # Every visible coin overlapping a redrawn patch is drawn again, in the order of the full render
+        blit_sprites(canvas, sprite, np.argwhere(shown & dilate(redrawn, reach)), cell_size)
+    # No hidden coin reaches the other patches: the full render is exact there, and overwrites the
+    # patches of the coins just drawn that are not redrawn (which miss their other neighbours)
+    rows, cols = patch_indices(np.argwhere(clean), size, full.shape, cell_size)
+    canvas[rows, cols] = full[rows, cols]
+    return canvas
+
+
+def blit_sprites(
+    canvas: NDArray[np.uint8],
+    sprite: NDArray[np.float32],
+    cells: NDArray[np.integer],
+    cell_size: int = CELL_SIZE,
+) -> NDArray[np.uint8]:
+    """Alpha-blend the sprite centered at every (row, col) cell, in a few batched operations.
+
+    A sprite larger than a cell spills over its neighbours: the cells are then drawn in batches
+    whose patches never overlap, and parts of sprites outside the canvas are clipped.
+    """
+    cells = np.asarray(cells, dtype=np.intp).reshape(-1, 2)
+    if len(cells) == 0:
+        return canvas
+    size = sprite.shape[0]
+    # Offset of a patch from its cell's corner (negative when the sprite spills over)
+    pad = (cell_size - size) // 2
+    corners = cells * cell_size + pad
+    inside = (corners >= 0).all(axis=1) & (corners + size <= canvas.shape[:2]).all(axis=1)
+
+    # Cells in the same class modulo the span of a patch (in cells) are too far apart to overlap
+    span_cells = -(-size // cell_size)
+    classes = (cells[:, 0] % span_cells) * span_cells + cells[:, 1] % span_cells
+    span = np.arange(size)
+    alpha = sprite[..., 3:]
+    for c in np.unique(classes):
+        batch = corners[(classes == c) & inside]
+        # Pixel indices of every patch, shape (n, size, 1) and (n, 1, size)
+        rows = batch[:, 0][:, None, None] + span[None, :, None]
+        cols = batch[:, 1][:, None, None] + span[None, None, :]
+        patches = canvas[rows, cols].astype(np.float32)
+        blended = sprite[..., :3] * 255.0 * alpha + patches[..., :3] * (1.0 - alpha)
+        canvas[rows, cols, :3] = np.rint(blended).astype(np.uint8)
+        # The few patches crossing the edges of the canvas, clipped one by one
+        for top, left in corners[(classes == c) & ~inside]:
+            r0, c0 = max(top, 0), max(left, 0)
+            r1, c1 = min(top + size, canvas.shape[0]), min(left + size, canvas.shape[1])
+            if r0 >= r1 or c0 >= c1:
+                continue
+            part = sprite[r0 - top:r1 - top, c0 - left:c1 - left]
+            patch = canvas[r0:r1, c0:c1, :3].astype(np.float32)
+            blended = part[..., :3] * 255.0 * part[..., 3:] + patch * (1.0 - part[..., 3:])
+            canvas[r0:r1, c0:c1, :3] = np.rint(blended).astype(np.uint8)
+    return canvas
+
+###########################################
+# Render backends
+###########################################
+
+def render_numpy(
+    width: int,
+    height: int,
+    cells: NDArray[np.integer],
+    coin_path: Union[str, Path],
+    coin_zoom: float,
+) -> NDArray[np.uint8]:
+    """Draw the coin sprite at every visible cell using NumPy only."""
+    coin_img = ASSETS.get_for_zoom(coin_path, coin_zoom)
+    canvas = background(width, height).copy()
+    return blit_sprites(canvas, coin_img, cells)
+
+
+def render_matplotlib(
+    width: int,
+    height: int,
+    cells: NDArray[np.integer],
+    coin_path: Union[str, Path],
+    coin_zoom: float,
+) -> NDArray[np.uint8]:
+    """Reference backend: one AnnotationBbox artist per visible coin."""
+    fig = plt.figure(
+        figsize=(width * CELL_SIZE / RENDER_DPI, height * CELL_SIZE / RENDER_DPI),
+        dpi=RENDER_DPI
+    )
+    # Axes fill the figure so that cell (r, c) lands on the same pixels as in render_numpy
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.set_xlim(0, width)
+    ax.set_ylim(height, 0)
+    ax.set_axis_off()
+
+    coin_img = OffsetImage(ASSETS.get_float(coin_path), zoom=coin_zoom)
+    for (r, c) in np.asarray(cells).reshape(-1, 2).tolist():
+        coin_img.image.axes = ax
+        ab = AnnotationBbox(
+            coin_img,
+            (c + 0.5, r + 0.5),
+            frameon=False
+        )
+        ax.add_artist(ab)
+
+    fig.canvas.draw()
+    img = np.frombuffer(fig.canvas.buffer_rgba(), dtype=np.uint8)
+    img = img.reshape(fig.canvas.get_width_height()[::-1] + (4,)).copy()  # (H, W, 4)
+    plt.close(fig)
+    return img
+
+
+def render_placeholder(
+    width: int,
+    height: int,
+    cells: NDArray[np.integer],
+    coin_path: Union[str, Path] = None,
+    coin_zoom: float = None,
+) -> NDArray[np.uint8]:
+    """Low-resolution stand-in for a map that is not ready: one coin-colored square per visible cell."""
+    small = np.empty((height, width, 4), dtype=np.uint8)
+    small[...] = BACKGROUND_COLOR
+    cells = np.asarray(cells, dtype=np.intp).reshape(-1, 2)
+    small[cells[:, 0], cells[:, 1]] = PLACEHOLDER_COIN_COLOR
+    # Same size as the full render, so that the page layout does not change
+    return np.repeat(np.repeat(small, CELL_SIZE, axis=0), CELL_SIZE, axis=1)
+
+
+###########################################
+# Transport
+###########################################
+
+def encode_png(img: NDArray[np.uint8], compress_level: int = 6) -> bytes:
+    """Compress a rendered (H, W, 4) map into PNG bytes for the browser to decode."""
+    # The canvas is opaque, so dropping the alpha channel saves a quarter of the raw data
+    mode_img = img[..., :3] if (img[..., 3] == 255).all() else img
+    buffer = io.BytesIO()
+    Image.fromarray(np.ascontiguousarray(mode_img)).save(buffer, format="PNG", compress_level=compress_level)
+    return buffer.getvalue()
+
+
+def png_data_url(png: bytes) -> str:
+    """Inline PNG bytes as a data URL that can be used as an image source."""
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+
+###########################################
+# Backend registry
+###########################################
+
+RENDER_BACKENDS: Dict[str, Callable[..., NDArray[np.uint8]]] = {
+    "numpy": render_numpy,
+    "matplotlib": render_matplotlib,
+}
+
+# Backends whose renders composite_cells can derive the render of fewer coins from
+COMPOSITE_BACKENDS = ["numpy"]
@@ -0,0 +1,212 @@
+# Module with the pool of render worker processes
+#
+# Maps are drawn in separate processes, so that a slow render (e.g. with the matplotlib backend) never
+# holds the web worker serving the request. Each web worker process starts its own bounded pool of
+# RENDER_WORKERS processes when it starts (see start, called from Exp.gunicorn_post_worker_init), or else
+# on first use. A request waits at most RENDER_TIMEOUT_SECONDS for its map;
+# when the pool already has RENDER_MAX_PENDING jobs, no further job is queued. In both cases the page gets
+# a low-resolution placeholder, as it does when the job fails, and a late render still lands in the render
+# cache for the next page load.
+# The processes are started with RENDER_START_METHOD, never forked from the multi-threaded web worker.
+# Dallinger imports the experiment as the dallinger_experiment package, an alias that only exists in the
+# web worker: each render process registers it again (see package_initializer) before unpickling any job.
+# Set RENDER_WORKERS = 0 to render in the web worker itself.
+
+##########################################################################################
+# Imports
+##########################################################################################
+import threading
+import multiprocessing
+
+from pathlib import Path
+from numpy.typing import NDArray
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from dallinger.config import initialize_experiment_package
+from psynet.utils import get_logger
+
+from .asset_registry import ASSETS
+from .render_engine import RENDER_BACKENDS
+from .instrumentation import METRICS
+from .game_parameters import (
+    RENDER_WORKERS,
+    RENDER_TIMEOUT_SECONDS,
+    RENDER_MAX_PENDING,
+    RENDER_START_METHOD,
+)
+
+logger = get_logger()
+
+###########################################
+# Render jobs
+###########################################
+
+def render_job(
+    backend: str,
+    width: int,
+    height: int,
+    cells: NDArray[np.integer],
+    coin_path: Union[str, Path],
+    coin_zoom: float,
+) -> NDArray[np.uint8]:
+    """Runs in a worker process: only plain arrays and paths cross the process boundary."""
+    return RENDER_BACKENDS[backend](
+        width=width,
+        height=height,
+        cells=cells,
+        coin_path=coin_path,
+        coin_zoom=coin_zoom,
+    )
+
+
+def warm_up_job(coin_paths: Iterable[str], coin_zooms: Iterable[float]) -> None:
+    """Runs in a worker process when the pool starts: decodes the sprites ahead of the first render."""
+    ASSETS.warm_up(coin_paths, coin_zooms=coin_zooms)
+
+
+def package_initializer() -> Tuple[Optional[Callable[..., None]], Tuple[Any, ...]]:
+    """(initializer, initargs) making this package importable in a render process under its current name."""
+    package = __name__.rpartition(".")[0]
+    if package != "dallinger_experiment":
+        # A regular package, importable from the sys.path the render processes start with
+        return None, ()
+    return initialize_experiment_package, (str(Path(__file__).parent),)
+
+###########################################
+# Render pool
+###########################################
+
+class RenderPool:
+    """Bounded pool of render processes with per-job timeouts and back-pressure."""
+
+    def __init__(
+        self,
+        workers: int = RENDER_WORKERS,
+        timeout: Optional[float] = RENDER_TIMEOUT_SECONDS,
+        max_pending: int = RENDER_MAX_PENDING,
+        start_method: str = RENDER_START_METHOD,
+    ) -> None:
+        assert(start_method != "fork"), "Render processes must not be forked from the multi-threaded web worker."
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def start(self, coin_paths: Iterable[Union[str, Path]] = (), coin_zooms: Iterable[float] = ()) -> None:
+        """Start the render processes now rather than on the first request, without waiting for them."""
+        if not self.enabled:
+            return
+        coin_paths, coin_zooms = [str(path) for path in coin_paths], list(coin_zooms)
+        with self._lock:
+            executor = self._get_executor()
+            try:
+                for _ in range(self.workers):
+                    executor.submit(warm_up_job, coin_paths, coin_zooms)
+            except BrokenProcessPool:
+                self._executor = None
+                return
+        logger.info(f"Render pool: started {self.workers} render process(es).")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Called with the lock held
+        if self._executor is None:
+            initializer, initargs = package_initializer()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=initializer,
+                initargs=initargs,
+            )
+        return self._executor
+
+    def render(
+        self,
+        world: Any,
+        coin_percentage: float,
+        coin_zoom: float,
+        backend: str,
+        seed: int,
+        on_late: Optional[Callable[[NDArray[np.uint8]], None]] = None,
+        timeout: Optional[float] = -1,
+    ) -> Optional[NDArray[np.uint8]]:
+        """Render the world in a worker process.
+
+        Returns None if the pool is saturated or the render takes longer than the timeout
+        (-1: the pool's timeout, None: wait for as long as it takes). A render that finishes
+        after its timeout is passed to on_late.
+        """
+        if backend not in RENDER_BACKENDS:
+            raise ValueError(f"Render backend {backend} not supported. Choose from {list(RENDER_BACKENDS.keys())}.")
+        if not self.enabled:
+            return world.render(show=False, coin_percentage=coin_percentage, coin_zoom=coin_zoom, backend=backend, seed=seed)
+        timeout = self.timeout if timeout == -1 else timeout
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                METRICS.count("render_pool.rejected")
+                logger.info(f"Render pool: {self._pending} job(s) pending, not queueing another render.")
+                return None
+            try:
+                future = self._get_executor().submit(
+                    render_job,
+                    backend,
+                    world.width,
+                    world.height,
+                    world.visible_coins(coin_percentage, seed),
+                    str(world.coin_path),
+                    coin_zoom,
+                )
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for its memory), start a fresh pool for the next jobs
+                logger.info("Render pool: the pool is broken, restarting it.")
+                self._executor = None
+                return None
+            self._pending += 1
+        METRICS.gauge("render_pool.pending", self._pending)
+
+        late = threading.Event()
+        future.add_done_callback(lambda f: self._done(f, late, on_late))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            late.set()
+            METRICS.count("render_pool.timeouts")
+            logger.info(f"Render pool: render took longer than {timeout} s, returning a placeholder.")
+            return None
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            logger.info("Render pool: the pool is broken, restarting it.")
+            return None
+        except Exception as e:
+            # A failed render must not fail the page, which shows the placeholder instead
+            METRICS.count("render_pool.errors")
+            logger.info(f"Render pool: render failed ({type(e).__name__}: {e}), returning a placeholder.")
+            return None
+
+    def _done(self, future: Future, late: threading.Event, on_late: Optional[Callable]) -> None:
+        with self._lock:
+            self._pending -= 1
+        METRICS.gauge("render_pool.pending", self._pending)
+        if late.is_set() and on_late is not None and not future.cancelled() and future.exception() is None:
+            on_late(future.result())
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+RENDER_POOL = RenderPool()
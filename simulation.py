@@ -0,0 +1,183 @@
+# Module with the offline chain simulator
+#
+# Simulates create-and-rate chains without PsyNet, with the coordinator played by a policy,
+# on all the cores of the machine. From the directory above the experiment, e.g. in Docker:
+#   bash docker/run bash -c "cd / && python -m experiment.simulation --chains 1000"
+
+##########################################################################################
+# Imports
+##########################################################################################
+import os
+import json
+import time
+import argparse
+import numpy as np
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Iterator, Union
+
+from .helper_classes import (
+    World,
+    SliderValues,
+    ForagerPositions,
+    WealthTracker,
+)
+from .harvest import harvest_world
+from .policies import Policy, POLICIES, get_policy
+from .game_parameters import (
+    NUM_FORAGERS,
+    NUM_CENTROIDS,
+    NUM_COINS,
+    LIST_OF_DISTRIBUTIONS,
+    DISPERSION,
+    STARTING_OVERHEAD,
+    INITIAL_WEALTH,
+    MAX_NODES_PER_CHAIN,
+    SIMULATION_POLICY,
+    SIMULATION_OUTPUT,
+)
+
+###########################################
+# Chain simulator
+###########################################
+
+def simulate_chain(
+    seed: int,
+    policy: Policy,
+    distribution: str,
+    num_nodes: int = MAX_NODES_PER_CHAIN,
+    num_coins: int = NUM_COINS,
+    num_centroids: int = NUM_CENTROIDS,
+    dispersion: float = DISPERSION,
+) -> List[Dict[str, Any]]:
+    """One record per node of a chain played by the policy.
+
+    Each node goes through the same steps as the experiment: the coordinator invests and sees
+    the revealed coins, positions the foragers and sets the overhead, then
+    CustomNode.summarize_trials splits the harvest with the new contract and passes the world,
+    sliders and wealth on to the next node.
+    """
+    rng = np.random.default_rng(seed)
+    world = World(
+        num_coins=num_coins,
+        num_centroids=num_centroids,
+        distribution=distribution,
+        dispersion=dispersion,
+        seed=seed,
+    )
+    sliders = SliderValues()
+    sliders.update_overhead(STARTING_OVERHEAD)
+    wealth = INITIAL_WEALTH
+
+    records = []
+    for node in range(num_nodes):
+        # Coordinator trial
+        investment = policy.choose_investment(world, wealth, rng)
+        visible = world.visible_coins(investment)
+        positions = ForagerPositions()
+        for position in policy.place_foragers(world, visible, rng, NUM_FORAGERS):
+            positions.add_forager_position(position)
+        overhead = policy.choose_overhead(sliders.get_overhead(), wealth, rng)
+
+        # Node summary: only the overhead slider is taken from the coordinator (see SliderValues.update_from_trials)
+        sliders = SliderValues()
+        sliders.update_overhead(overhead)
+        tracker = WealthTracker()
+        tracker.update_from_production(harvest_world(world, positions.forager_positions), sliders)
+
+        records.append({
+            "seed": seed,
+            "policy": policy.name,
+            "distribution": distribution,
+            "node": node,
+            "investment": investment,
+            "visible_coins": len(visible),
+            "positions": positions.forager_positions,
+            "overhead": sliders.get_overhead(),
+            "prerogative": sliders.get_coordinator_prerogative(),
+            "wages": sliders.get_wages_commission(),
+            "wealth": tracker.n_coins,
+            "coordinator_wealth": tracker.get_coordinator_wealth(),
+            "foragers_wealth": tracker.foragers_wealth,
+        })
+        wealth = tracker.n_coins
+    return records
+
+
+def _simulate_chain_task(
+    seed: int,
+    policy_name: str,
+    policy_kwargs: Dict[str, Any],
+    distribution: str,
+    simulation_kwargs: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    # Policies are built in the worker, so only plain arguments cross the process boundary
+    return simulate_chain(seed, get_policy(policy_name, **policy_kwargs), distribution, **simulation_kwargs)
+
+
+def run_simulations(
+    seeds: List[int],
+    policy_name: str = SIMULATION_POLICY,
+    policy_kwargs: Optional[Dict[str, Any]] = None,
+    distributions: List[str] = LIST_OF_DISTRIBUTIONS,
+    workers: Optional[int] = None,
+    **simulation_kwargs,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Simulate one chain per (seed, distribution) on a process pool, yielding each chain as it finishes."""
+    policy_kwargs = policy_kwargs or dict()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(_simulate_chain_task, seed, policy_name, policy_kwargs, distribution, simulation_kwargs)
+            for seed in seeds
+            for distribution in distributions
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def write_simulations(
+    path: Union[str, Path],
+    chains: Iterator[List[Dict[str, Any]]],
+) -> int:
+    """Stream the node records to a JSONL file, one line per node. Returns the number of chains written."""
+    n_chains = 0
+    with open(path, "w") as f:
+        for records in chains:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            n_chains += 1
+    return n_chains
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate create-and-rate chains offline.")
+    parser.add_argument("--out", type=str, default=str(SIMULATION_OUTPUT))
+    parser.add_argument("--policy", type=str, default=SIMULATION_POLICY, choices=list(POLICIES))
+    parser.add_argument("--chains", type=int, default=100, help="Chains per distribution.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--nodes", type=int, default=MAX_NODES_PER_CHAIN)
+    parser.add_argument("--distributions", type=str, nargs="+", default=LIST_OF_DISTRIBUTIONS)
+    parser.add_argument("--num-coins", type=int, default=NUM_COINS)
+    parser.add_argument("--centroids", type=int, default=NUM_CENTROIDS)
+    parser.add_argument("--dispersion", type=float, default=DISPERSION)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    chains = run_simulations(
+        seeds=list(range(args.seed, args.seed + args.chains)),
+        policy_name=args.policy,
+        distributions=args.distributions,
+        workers=args.workers,
+        num_nodes=args.nodes,
+        num_coins=args.num_coins,
+        num_centroids=args.centroids,
+        dispersion=args.dispersion,
+    )
+    n_chains = write_simulations(args.out, chains)
+    print(f"Wrote {n_chains} chains to {args.out} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Module with the spatial index over coin positions
+
+##########################################################################################
+# Imports
+##########################################################################################
+import numpy as np
+
+from numpy.typing import NDArray
+from typing import Iterable, Union
+
+from .game_parameters import SPATIAL_INDEX_BUCKET_SIZE
+
+###########################################
+# Spatial index
+###########################################
+
+class CoinIndex:
+    """Uniform grid bucket index over (row, col) coin cells.
+
+    Coins are sorted by bucket and each bucket is a contiguous slice of the sorted arrays,
+    so a query only looks at the coins of the buckets overlapping the query region.
+    Distances are measured between a position and the centers of the coin cells.
+    """
+
+    def __init__(
+        self,
+        coins: NDArray[np.integer],
+        bucket_size: int = SPATIAL_INDEX_BUCKET_SIZE,
+    ) -> None:
+        assert(bucket_size > 0), f"Bucket size must be positive (but got {bucket_size})."
+        self.coins = coins
+        self.bucket_size = bucket_size
+        cells = np.asarray(coins, dtype=np.int64).reshape(-1, 2)
+        self.n_rows = int(cells[:, 0].max()) // bucket_size + 1 if len(cells) else 1
+        self.n_cols = int(cells[:, 1].max()) // bucket_size + 1 if len(cells) else 1
+        buckets = (cells[:, 0] // bucket_size) * self.n_cols + cells[:, 1] // bucket_size
+        self.order = np.argsort(buckets, kind="stable")
+        self.centers = cells[self.order].astype(np.float64) + 0.5
+        # starts[b]:starts[b + 1] is the slice of bucket b in the sorted arrays
+        self.starts = np.searchsorted(buckets[self.order], np.arange(self.n_rows * self.n_cols + 1))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _candidates(self, position: Iterable[float], reach: float) -> NDArray[np.intp]:
+        """Positions in the sorted arrays of the coins in the buckets within reach of the position."""
+        row, col = position
+        b = self.bucket_size
+        r0 = max(int(np.floor((row - reach) / b)), 0)
+        r1 = min(int(np.floor((row + reach) / b)), self.n_rows - 1)
+        c0 = max(int(np.floor((col - reach) / b)), 0)
+        c1 = min(int(np.floor((col + reach) / b)), self.n_cols - 1)
+        if r0 > r1 or c0 > c1:
+            return np.zeros(0, dtype=np.intp)
+        # Buckets of a row of buckets are contiguous, so each row of buckets is one slice
+        first = np.arange(r0, r1 + 1) * self.n_cols
+        slices = [np.arange(self.starts[f + c0], self.starts[f + c1 + 1]) for f in first]
+        return np.concatenate(slices)
+
+    def query_radius(self, position: Iterable[float], radius: float) -> NDArray[np.intp]:
+        """Indices (into the original coin array) of the coins within the radius of the position."""
+        candidates = self._candidates(position, radius)
+        offsets = self.centers[candidates] - np.asarray(position, dtype=np.float64)
+        inside = np.einsum("ij,ij->i", offsets, offsets) <= radius ** 2
+        return self.order[candidates[inside]]
+
+    def count_within(self, positions: Union[Iterable[float], NDArray[np.float64]], radius: float) -> NDArray[np.int64]:
+        """Number of coins within the radius of each (row, col) position."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        return np.array([len(self.query_radius(p, radius)) for p in positions], dtype=np.int64)
+
+    def nearest(self, position: Iterable[float], k: int) -> NDArray[np.intp]:
+        """Indices of the k coins nearest to the position, closest first."""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.zeros(0, dtype=np.intp)
+        position = np.asarray(position, dtype=np.float64)
+        reach = float(self.bucket_size)
+        max_reach = self.bucket_size * (max(self.n_rows, self.n_cols) + 1) + np.abs(position).max()
+        while True:
+            candidates = self._candidates(position, reach)
+            if len(candidates) >= k or reach > max_reach:
+                offsets = self.centers[candidates] - position
+                distances = np.einsum("ij,ij->i", offsets, offsets)
+                ranked = np.argsort(distances, kind="stable")[:k]
+                # The buckets cover the disc of radius reach, so results inside it are exact
+                if distances[ranked[-1]] <= reach ** 2 or reach > max_reach:
+                    return self.order[candidates[ranked]]
+            reach *= 2
@@ -0,0 +1,53 @@
+# Regression checks of the micro-benchmarks against the stored baseline (see benchmarks.py).
+#
+# To run these checks via Docker, run the following in your terminal:
+#
+# bash docker/run env RUN_BENCHMARKS=1 pytest test_benchmarks.py
+#
+# The timings depend on the machine, so these checks only run when RUN_BENCHMARKS is set, and only
+# against a baseline recorded on the same platform.
+# Set BENCHMARK_TOLERANCE to change the slowdown allowed, e.g. BENCHMARK_TOLERANCE=1.0 for 2x.
+
+import os
+import json
+import platform
+
+import pytest
+
+from .benchmarks import BENCHMARKS, load_baseline, precompute_disabled, time_operation
+from .game_parameters import BENCHMARK_BASELINE_PATH, BENCHMARK_TOLERANCE, BENCHMARK_FLOOR_SECONDS
+
+BASELINE = load_baseline()
+TOLERANCE = float(os.environ.get("BENCHMARK_TOLERANCE", BENCHMARK_TOLERANCE))
+
+
+def recorded_platform():
+    if not BENCHMARK_BASELINE_PATH.exists():
+        return None
+    with open(BENCHMARK_BASELINE_PATH) as f:
+        baseline = json.load(f)
+    return baseline.get("machine"), baseline.get("python")
+
+
+pytestmark = [
+    pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="Set RUN_BENCHMARKS=1 to check the timings."),
+    pytest.mark.skipif(
+        recorded_platform() not in [None, (platform.machine(), platform.python_version())],
+        reason="The baseline was recorded on another platform, record one here with --update-baseline.",
+    ),
+]
+
+
+@pytest.fixture(autouse=True)
+def no_precompute():
+    with precompute_disabled():
+        yield
+
+
+@pytest.mark.parametrize("name", list(BENCHMARKS))
+def test_benchmark(name):
+    if name not in BASELINE:
+        pytest.skip(f"No baseline for {name}, record one with `python -m experiment.benchmarks --update-baseline`.")
+    seconds = time_operation(BENCHMARKS[name]())
+    limit = max(BASELINE[name] * (1 + TOLERANCE), BASELINE[name] + BENCHMARK_FLOOR_SECONDS)
+    assert seconds <= limit, f"{name} took {1000 * seconds:.4f} ms, over the {1000 * limit:.4f} ms allowed ({1000 * BASELINE[name]:.4f} ms baseline + {TOLERANCE:.0%}, at least {1000 * BENCHMARK_FLOOR_SECONDS:.1f} ms)."
@@ -0,0 +1,61 @@
+# Checks of the contract payout split (see contract.py).
+#
+# To run these checks via Docker, run the following in your terminal:
+#
+# bash docker/run pytest test_contract.py
+
+import numpy as np
+import pytest
+
+from .contract import contract_payoffs, settings_grid
+from .helper_classes import SliderValues, WealthTracker
+from .game_parameters import NUM_FORAGERS, STARTING_PREROGATIVE
+
+
+def make_slider(overhead, wages, prerogative=STARTING_PREROGATIVE):
+    slider = SliderValues()
+    slider.update_overhead(overhead)
+    slider.update_wages_commission(wages)
+    slider.update_coordinator_prerogative(prerogative)
+    return slider
+
+
+@pytest.mark.parametrize("overhead", [0.0, 0.3, 0.5, 1.0])
+@pytest.mark.parametrize("prerogative", [0.0, STARTING_PREROGATIVE, 1.0])
+def test_initialize_keeps_the_baseline_split(overhead, prerogative):
+    # The coordinator takes overhead * T and the foragers share the rest evenly, whatever the prerogative
+    tracker = WealthTracker(100)
+    tracker.initialize(make_slider(overhead, 0.5, prerogative))
+    assert tracker.get_coordinator_wealth() == pytest.approx(overhead * 100)
+    for forager_id in range(NUM_FORAGERS):
+        assert tracker.get_forager_wealth(forager_id) == pytest.approx((1 - overhead) * 100 / NUM_FORAGERS)
+
+
+def test_production_split():
+    tracker = WealthTracker()
+    productions = np.arange(1, NUM_FORAGERS + 1, dtype=float)
+    total = productions.sum()
+    tracker.update_from_production(productions, make_slider(0.2, 0.25))
+    remaining = 0.8 * total
+    assert tracker.get_coordinator_wealth() == pytest.approx(0.2 * total)
+    for forager_id, production in enumerate(productions):
+        expected = 0.25 * remaining / NUM_FORAGERS + 0.75 * remaining * production / total
+        assert tracker.get_forager_wealth(forager_id) == pytest.approx(expected)
+
+
+def test_payoffs_add_up_to_the_production():
+    rng = np.random.default_rng(0)
+    productions = rng.integers(0, 20, size=(50, NUM_FORAGERS))
+    coordinator, foragers = contract_payoffs(rng.random(10), rng.random(10), rng.random(10), productions)
+    np.testing.assert_allclose(coordinator + foragers.sum(axis=2), np.broadcast_to(productions.sum(axis=1), (10, 50)))
+
+
+def test_prerogative_does_not_change_the_split():
+    overhead, wages, prerogative = settings_grid([0.1, 0.5], [0.0, 0.5, 1.0], [0.0, 0.5, 1.0])
+    assert overhead.shape == wages.shape == prerogative.shape == (18,)
+    productions = np.vstack([np.zeros(NUM_FORAGERS), np.arange(1, NUM_FORAGERS + 1), np.full(NUM_FORAGERS, 4)])
+    coordinator, foragers = contract_payoffs(overhead, wages, prerogative, productions)
+    assert coordinator.shape == (18, 3) and foragers.shape == (18, 3, NUM_FORAGERS)
+    baseline_coordinator, baseline_foragers = contract_payoffs(overhead, wages, 0.0, productions)
+    np.testing.assert_allclose(coordinator, baseline_coordinator)
+    np.testing.assert_allclose(foragers, baseline_foragers)
@@ -0,0 +1,107 @@
+# Checks of the forager slot claims (see forager_slots.py) and the free list of ForagerPositions they rely on.
+#
+# To run these checks via Docker, run the following in your terminal:
+#
+# bash docker/run pytest test_forager_slots.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from . import forager_slots
+from .benchmarks import make_positions, make_world
+from .forager_slots import POSITIONS_VARIABLE, claim_forager_position
+from .helper_classes import ForagerPositions
+from .game_parameters import NUM_FORAGERS
+
+
+class MockVars(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+class MockQuery:
+    """Stands in for TrialNode.query: records the row lock and returns the node."""
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.locked = []
+
+    def filter_by(self, id):
+        self.id = id
+        return self
+
+    def with_for_update(self, of):
+        self.locked.append(self.id)
+        return self
+
+    def populate_existing(self):
+        return self
+
+    def one(self):
+        return self.nodes[self.id]
+
+
+@pytest.fixture
+def node(monkeypatch):
+    node = SimpleNamespace(id=7, var=MockVars())
+    query = MockQuery({node.id: node})
+    monkeypatch.setattr(forager_slots, "TrialNode", SimpleNamespace(query=query))
+    node.query = query
+    return node
+
+
+def initial_positions():
+    return make_positions(make_world())
+
+
+def test_free_list_gives_distinct_ids():
+    positions = initial_positions()
+    ids = [positions.get_forager_position(trial_id)[0] for trial_id in range(NUM_FORAGERS)]
+    assert sorted(ids) == list(range(NUM_FORAGERS))
+    assert positions.free_ids == []
+
+
+def test_free_list_repeated_claim_gets_the_same_slot():
+    positions = initial_positions()
+    first = positions.get_forager_position(1)
+    assert positions.get_forager_position(1) == first
+    assert len(positions.free_ids) == NUM_FORAGERS - 1
+
+
+def test_free_list_runs_out():
+    positions = initial_positions()
+    for trial_id in range(NUM_FORAGERS):
+        positions.get_forager_position(trial_id)
+    with pytest.raises(AssertionError, match="empty forager queue"):
+        positions.get_forager_position(NUM_FORAGERS)
+
+
+def test_claims_are_stored_on_the_locked_node(node):
+    claims = {trial_id: claim_forager_position(node, 3, trial_id, initial_positions) for trial_id in range(NUM_FORAGERS)}
+    assert node.query.locked == [node.id] * NUM_FORAGERS
+    assert sorted(forager_id for forager_id, _ in claims.values()) == list(range(NUM_FORAGERS))
+
+    stored = node.var[POSITIONS_VARIABLE]["3"]
+    assert isinstance(stored, ForagerPositions)
+    assert stored.free_ids == []
+    # A trial claiming again gets its first slot back
+    assert claim_forager_position(node, 3, 0, initial_positions) == claims[0]
+
+
+def test_coordinator_trials_have_their_own_slots(node):
+    first = claim_forager_position(node, 3, 10, initial_positions)
+    second = claim_forager_position(node, 4, 11, initial_positions)
+    assert set(node.var[POSITIONS_VARIABLE]) == {"3", "4"}
+    assert len(node.var[POSITIONS_VARIABLE]["3"].free_ids) == len(node.var[POSITIONS_VARIABLE]["4"].free_ids) == NUM_FORAGERS - 1
+    assert first[1] in node.var[POSITIONS_VARIABLE]["3"].forager_positions
+    assert second[1] in node.var[POSITIONS_VARIABLE]["4"].forager_positions
+
+
+def test_claim_without_free_slot_keeps_the_store(node):
+    for trial_id in range(NUM_FORAGERS):
+        claim_forager_position(node, 3, trial_id, initial_positions)
+    assignments = dict(node.var[POSITIONS_VARIABLE]["3"].trial_assignments)
+    with pytest.raises(AssertionError, match="empty forager queue"):
+        claim_forager_position(node, 3, NUM_FORAGERS, initial_positions)
+    assert node.var[POSITIONS_VARIABLE]["3"].trial_assignments == assignments
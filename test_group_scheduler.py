@@ -0,0 +1,103 @@
+# Checks of the scheduling of participants into the groups of the parallel chains (see group_scheduler.py).
+#
+# To run these checks via Docker, run the following in your terminal:
+#
+# bash docker/run pytest test_group_scheduler.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from .experiment import start_nodes, trial_maker
+from .group_scheduler import GroupScheduler, WAIT_STARTED_VARIABLE
+from .game_parameters import (
+    NUM_FORAGERS,
+    START_NODES_PER_DISTRIBUTION,
+    LIST_OF_DISTRIBUTIONS,
+    TRIALS_PER_PARTICIPANT,
+)
+
+
+class MockVars(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+def make_participant(participant_id=1):
+    return SimpleNamespace(id=participant_id, var=MockVars())
+
+
+def make_network(node_id, creation_time, n_viable_trials_at_head=0):
+    head = SimpleNamespace(id=node_id, creation_time=creation_time)
+    return SimpleNamespace(head=head, n_viable_trials_at_head=n_viable_trials_at_head)
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    # (non-failed, finalized) coordinator trials per head node, instead of the database query
+    creations = dict()
+    scheduler = GroupScheduler()
+    monkeypatch.setattr(
+        scheduler, "count_creations",
+        lambda trial_maker, node_ids: {node_id: creations.get(node_id, (0, 0)) for node_id in node_ids},
+    )
+    scheduler.creations = creations
+    scheduler.begin()
+    return scheduler
+
+
+TRIAL_MAKER = SimpleNamespace(n_creators=1, trials_per_node=1 + NUM_FORAGERS)
+
+
+def test_default_has_parallel_chains():
+    assert len(LIST_OF_DISTRIBUTIONS) * START_NODES_PER_DISTRIBUTION > 1
+
+
+def test_fullest_group_first(scheduler):
+    # Chain 1 has its coordinator and a forager, chain 2 its coordinator, chain 3 nobody yet
+    networks = [make_network(3, 0.0), make_network(2, 1.0, 1), make_network(1, 2.0, 2)]
+    scheduler.creations.update({1: (1, 1), 2: (1, 1)})
+    ordered = scheduler.prioritize(TRIAL_MAKER, networks, make_participant())
+    assert [network.head.id for network in ordered] == [1, 2, 3]
+
+
+def test_oldest_group_first_among_equals(scheduler):
+    networks = [make_network(node_id, creation_time) for node_id, creation_time in [(1, 3.0), (2, 1.0), (3, 2.0)]]
+    ordered = scheduler.prioritize(TRIAL_MAKER, networks, make_participant())
+    assert [network.head.id for network in ordered] == [2, 3, 1]
+
+
+def test_blocked_groups_are_skipped(scheduler):
+    # The coordinator of chain 1 is still positioning the foragers
+    networks = [make_network(1, 0.0, 1), make_network(2, 1.0)]
+    scheduler.creations.update({1: (1, 0)})
+    ordered = scheduler.prioritize(TRIAL_MAKER, networks, make_participant())
+    assert [network.head.id for network in ordered] == [2]
+
+
+def test_wait_instead_of_exit_while_groups_are_blocked(scheduler):
+    networks = [make_network(1, 0.0, 1), make_network(2, 1.0, 1)]
+    scheduler.creations.update({1: (1, 0), 2: (1, 0)})
+    participant = make_participant()
+    assert scheduler.prioritize(TRIAL_MAKER, networks, participant) == []
+    assert scheduler.resolve("exit", participant, wait_for_networks=True) == "wait"
+    assert participant.var[WAIT_STARTED_VARIABLE] is not None
+
+    # Once a coordinator has finished, the participant joins its group and stops waiting
+    scheduler.begin()
+    scheduler.creations.update({2: (1, 1)})
+    ordered = scheduler.prioritize(TRIAL_MAKER, networks, participant)
+    assert [network.head.id for network in ordered] == [2]
+    assert scheduler.resolve(ordered, participant, wait_for_networks=True) == ordered
+    assert participant.var[WAIT_STARTED_VARIABLE] is None
+
+
+def test_exit_when_no_group_is_blocked(scheduler):
+    assert scheduler.prioritize(TRIAL_MAKER, [], make_participant()) == []
+    assert scheduler.resolve("exit", make_participant(), wait_for_networks=True) == "exit"
+
+
+def test_trials_per_participant_do_not_follow_the_chains():
+    assert trial_maker.chains_per_experiment == len(start_nodes)
+    assert trial_maker.expected_trials_per_participant == TRIALS_PER_PARTICIPANT
+    assert trial_maker.max_trials_per_participant == TRIALS_PER_PARTICIPANT
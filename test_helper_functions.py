@@ -0,0 +1,53 @@
+# Checks of the helper functions reading node definitions (see helper_functions.py).
+#
+# To run these checks via Docker, run the following in your terminal:
+#
+# bash docker/run pytest test_helper_functions.py
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from .helper_classes import World
+from .helper_functions import get_world_wealth_slider_from_node
+
+
+def make_definition(world):
+    return {'world': world, 'wealth': 100, 'overhead': 0.2, 'wages': 0.5, 'prerogative': 0.5}
+
+
+def make_legacy_world(width, height, positions):
+    # A World as pickled before the sparse coins: a dense (width, height) grid and no coins
+    grid = np.zeros((width, height))
+    grid[tuple(np.transpose(positions))] = 1
+    legacy = World.__new__(World)
+    legacy.__dict__.update(
+        width=width,
+        height=height,
+        num_coins=len(positions),
+        num_centroids=1,
+        distribution="linear",
+        dispersion=4,
+        grid=grid,
+    )
+    return legacy
+
+
+def test_world_from_definition():
+    world = World(width=40, height=30, num_coins=50, num_centroids=2, distribution="linear", dispersion=4)
+    node = SimpleNamespace(definition=make_definition(world.to_dict()))
+    loaded, slider, wealth = get_world_wealth_slider_from_node(node)
+    assert np.array_equal(loaded.coins, world.coins)
+    assert wealth == 100
+    assert slider.overhead == 0.2
+
+
+def test_legacy_world_is_converted():
+    positions = [(0, 0), (3, 7), (39, 29), (20, 1)]
+    node = SimpleNamespace(definition=make_definition(make_legacy_world(40, 30, positions)))
+    loaded, _, _ = get_world_wealth_slider_from_node(node)
+    # The coins keep the positions the legacy world reported
+    assert sorted(loaded.coin_positions()) == sorted(positions)
+    assert loaded.num_coins == len(positions)
+    assert loaded.grid.sum() == len(positions)
+    assert World.from_dict(loaded.to_dict()).coin_positions() == loaded.coin_positions()
@@ -0,0 +1,18 @@
+# Checks of the memory kept alive per trial page and node definition against MEMORY_BUDGETS (see memory_accounting.py).
+#
+# To run these checks via Docker, run the following in your terminal:
+#
+# bash docker/run pytest test_memory.py
+
+import pytest
+
+from .memory_accounting import MEMORY_PROBES, measure_allocation
+from .game_parameters import MEMORY_BUDGETS
+
+
+@pytest.mark.parametrize("name", list(MEMORY_PROBES))
+def test_memory_budget(name):
+    assert name in MEMORY_BUDGETS, f"No budget for {name}, add one to MEMORY_BUDGETS in game_parameters.py."
+    retained, _ = measure_allocation(MEMORY_PROBES[name]())
+    budget = MEMORY_BUDGETS[name]
+    assert retained <= budget, f"{name} keeps {retained / 1024:.1f} KiB alive, over its {budget / 1024:.1f} KiB budget."
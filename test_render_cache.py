@@ -0,0 +1,57 @@
+# Checks of the render cache tiers shared by the web workers (see render_cache.py).
+#
+# To run these checks via Docker, run the following in your terminal:
+#
+# bash docker/run pytest test_render_cache.py
+
+import numpy as np
+import pytest
+
+from .benchmarks import make_world
+from .render_cache import RenderCache
+from .render_workers import RENDER_POOL
+from .game_parameters import NUM_COINS
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    # Render in the test process
+    monkeypatch.setattr(RENDER_POOL, "workers", 0)
+    return tmp_path
+
+
+def test_png_is_shared_through_disk(cache_dir):
+    world = make_world()
+    png = RenderCache(cache_dir=cache_dir).get_png(world=world, investment=0.37, coin_zoom=1 / NUM_COINS, timeout=None)
+
+    # Another worker reads the encoded map from disk instead of rendering and encoding it again
+    other = RenderCache(cache_dir=cache_dir)
+    assert other.get_png(world=world, investment=0.37, coin_zoom=1 / NUM_COINS, timeout=None) == png
+    assert other.stats()["disk_hits"] == 1
+    assert other.stats()["memory_entries"] == 0
+
+
+def test_only_full_maps_are_stored_as_arrays(cache_dir):
+    world = make_world()
+    cache = RenderCache(cache_dir=cache_dir)
+    for investment in [0.5, 1]:
+        cache.get_png(world=world, investment=investment, coin_zoom=1 / NUM_COINS, timeout=None)
+    assert len(list(cache_dir.glob("*.png"))) == 2
+    assert len(list(cache_dir.glob("*.npy"))) == 1
+
+    cache.invalidate()
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_lower_investments_are_composited(cache_dir, monkeypatch):
+    # At the experiment's zoom, only the map showing all the coins is rendered
+    renders = []
+    render = RENDER_POOL.render
+    monkeypatch.setattr(RENDER_POOL, "render", lambda *args, **kwargs: renders.append(args) or render(*args, **kwargs))
+    world = make_world()
+    cache = RenderCache(cache_dir=cache_dir)
+    for investment in [0.2, 0.5, 0.9]:
+        img = cache.get_or_render(world=world, investment=investment, coin_zoom=1 / NUM_COINS, timeout=None)
+        expected = world.render(show=False, coin_percentage=investment, coin_zoom=1 / NUM_COINS, seed=world.render_seed())
+        assert np.array_equal(img, expected)
+    assert len(renders) == 1
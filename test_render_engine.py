@@ -0,0 +1,64 @@
+# Checks of the NumPy render backend against the matplotlib reference backend (see render_engine.py).
+#
+# To run these checks via Docker, run the following in your terminal:
+#
+# bash docker/run pytest test_render_engine.py
+
+import numpy as np
+import pytest
+
+from .benchmarks import make_world
+from .asset_registry import ASSETS
+from .render_engine import render_numpy, render_matplotlib, composite_cells
+from .game_parameters import CELL_SIZE, IMAGE_PATHS, NUM_COINS
+
+COIN_PATH = IMAGE_PATHS["coin_url"]
+ZOOMS = [0.005, 1 / NUM_COINS, 0.02]
+
+
+def coin_pixels(canvas):
+    return (canvas[..., :3] < 250).any(axis=-1)
+
+
+@pytest.mark.parametrize("coin_zoom", ZOOMS)
+@pytest.mark.parametrize("cell", [(2, 2), (0, 0), (4, 3)])
+def test_coin_covers_the_same_pixels(coin_zoom, cell):
+    # Sprites are drawn at coin_zoom * dpi / 72 as in matplotlib, clipped at the edges of the map
+    cells = np.array([cell])
+    numpy_pixels = np.argwhere(coin_pixels(render_numpy(5, 5, cells, COIN_PATH, coin_zoom)))
+    reference_pixels = np.argwhere(coin_pixels(render_matplotlib(5, 5, cells, COIN_PATH, coin_zoom)))
+    assert np.abs(numpy_pixels.min(axis=0) - reference_pixels.min(axis=0)).max() <= 1
+    assert np.abs(numpy_pixels.max(axis=0) - reference_pixels.max(axis=0)).max() <= 1
+
+
+@pytest.mark.parametrize("coin_zoom", ZOOMS)
+def test_map_parity(coin_zoom):
+    rng = np.random.default_rng(0)
+    cells = np.argwhere(rng.random((15, 20)) < 0.3)
+    numpy_pixels = coin_pixels(render_numpy(20, 15, cells, COIN_PATH, coin_zoom))
+    reference_pixels = coin_pixels(render_matplotlib(20, 15, cells, COIN_PATH, coin_zoom))
+    assert numpy_pixels.sum() == pytest.approx(reference_pixels.sum(), rel=0.4 if coin_zoom < 0.01 else 0.15)
+    assert (numpy_pixels != reference_pixels).mean() < 0.05
+
+
+@pytest.mark.parametrize("investment", [0.1, 0.5, 0.9])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_composite_matches_render(investment, seed):
+    # At the experiment's zoom, coins spill over their neighbours' cells
+    world = make_world(seed=seed)
+    coin_zoom = 1 / NUM_COINS
+    sprite = ASSETS.get_for_zoom(world.coin_path, coin_zoom)
+    assert sprite.shape[0] > CELL_SIZE
+    full = render_numpy(world.width, world.height, world.visible_coins(1, 0), world.coin_path, coin_zoom)
+    visible = world.visible_coins(investment, 0)
+    expected = render_numpy(world.width, world.height, visible, world.coin_path, coin_zoom)
+    assert np.array_equal(composite_cells(full, visible, world.coins, sprite), expected)
+
+
+def test_composite_at_the_edges():
+    # Coins of every corner and edge, every other one hidden
+    cells = np.array([(r, c) for r in [0, 1, 8, 9] for c in [0, 1, 5, 9]])
+    sprite = ASSETS.get_for_zoom(COIN_PATH, 0.02)
+    full = render_numpy(10, 10, cells, COIN_PATH, 0.02)
+    visible = cells[::2]
+    assert np.array_equal(composite_cells(full, visible, cells, sprite), render_numpy(10, 10, visible, COIN_PATH, 0.02))
@@ -0,0 +1,82 @@
+# Checks of the pool of render worker processes (see render_workers.py).
+#
+# To run these checks via Docker, run the following in your terminal:
+#
+# bash docker/run pytest test_render_workers.py
+
+import sys
+import subprocess
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from .benchmarks import make_world
+from .render_workers import RenderPool
+from .game_parameters import NUM_COINS
+
+
+def test_pool_renders_as_the_web_worker():
+    world = make_world()
+    pool = RenderPool(workers=1)
+    try:
+        img = pool.render(world, coin_percentage=0.5, coin_zoom=1 / NUM_COINS, backend="numpy", seed=0, timeout=60)
+        assert pool._executor._mp_context.get_start_method() == "forkserver"
+    finally:
+        pool.shutdown()
+    expected = world.render(show=False, coin_percentage=0.5, coin_zoom=1 / NUM_COINS, backend="numpy", seed=0)
+    assert np.array_equal(img, expected)
+    assert pool._pending == 0
+
+
+def test_fork_is_refused():
+    with pytest.raises(AssertionError):
+        RenderPool(start_method="fork")
+
+
+def test_job_errors_return_a_placeholder():
+    world = make_world()
+    world.coin_path = "missing/coin.png"
+    pool = RenderPool(workers=1)
+    try:
+        assert pool.render(world, coin_percentage=0.5, coin_zoom=1 / NUM_COINS, backend="numpy", seed=0, timeout=60) is None
+    finally:
+        pool.shutdown()
+    assert pool._pending == 0
+
+
+def test_start_warms_the_processes_up():
+    pool = RenderPool(workers=2)
+    try:
+        pool.start()
+        assert len(pool._executor._processes) == 2
+    finally:
+        pool.shutdown()
+
+
+# As Dallinger loads the experiment: under the dallinger_experiment alias, with its directory off sys.path
+DALLINGER_RENDER = """
+import sys
+from dallinger.config import initialize_experiment_package
+
+if __name__ == "__main__":
+    initialize_experiment_package(sys.argv[1])
+    from dallinger_experiment.benchmarks import make_world
+    from dallinger_experiment.render_workers import RenderPool
+    world = make_world()
+    pool = RenderPool(workers=1)
+    img = pool.render(world, coin_percentage=0.5, coin_zoom=0.01, backend="numpy", seed=0, timeout=120)
+    pool.shutdown()
+    assert img is not None, "The render process could not run the job."
+    print(img.shape)
+"""
+
+
+def test_pool_renders_under_the_dallinger_alias(tmp_path):
+    experiment_dir = Path(__file__).parent
+    result = subprocess.run(
+        [sys.executable, "-c", DALLINGER_RENDER, str(experiment_dir)],
+        cwd=tmp_path, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
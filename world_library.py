@@ -0,0 +1,169 @@
+# Module with the library of pregenerated worlds
+#
+# Build the library offline, from the directory above the experiment, e.g. in Docker:
+#   bash docker/run bash -c "cd / && python -m experiment.world_library"
+
+##########################################################################################
+# Imports
+##########################################################################################
+import json
+import argparse
+import itertools
+import numpy as np
+
+from pathlib import Path
+from numpy.typing import NDArray
+from typing import List, Dict, Any, Iterable, Optional, Union
+
+from .helper_classes import World
+from .game_parameters import (
+    NUM_COINS,
+    WORLD_LIBRARY_PATH,
+    WORLD_LIBRARY_VERSION,
+)
+
+###########################################
+# World library
+###########################################
+
+COINS_FILE = "coins.npy"
+INDEX_FILE = "index.json"
+
+
+def build_world_library(
+    path: Union[str, Path],
+    distributions: Iterable[str],
+    dispersions: Iterable[float],
+    num_centroids: Iterable[int],
+    worlds_per_setting: int,
+    num_coins: int = NUM_COINS,
+    seed: int = 0,
+) -> Path:
+    """Generate worlds over the grid of settings and write them to a single memory-mapped store.
+
+    The coins of all worlds are concatenated in one (total, 2) int16 array (coins.npy),
+    and index.json records the settings, seed and slice of every world.
+    World i of the library is generated with seed (seed + i), so the library is reproducible.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    settings = list(itertools.product(distributions, dispersions, num_centroids, range(worlds_per_setting)))
+
+    # Every world holds exactly num_coins coins, so the store can be allocated upfront
+    coins = np.lib.format.open_memmap(
+        path / COINS_FILE,
+        mode="w+",
+        dtype=np.int16,
+        shape=(len(settings) * num_coins, 2),
+    )
+    worlds = []
+    for i, (distribution, dispersion, centroids, _) in enumerate(settings):
+        world = World(
+            num_coins=num_coins,
+            num_centroids=centroids,
+            distribution=distribution,
+            dispersion=dispersion,
+            seed=seed + i,
+        )
+        offset = i * num_coins
+        coins[offset:offset + num_coins] = world.coins
+        worlds.append({
+            "offset": offset,
+            "num_coins": num_coins,
+            "width": int(world.width),
+            "height": int(world.height),
+            "num_centroids": int(centroids),
+            "distribution": distribution,
+            "dispersion": float(dispersion),
+            "seed": seed + i,
+        })
+    coins.flush()
+    del coins
+
+    index = {"version": WORLD_LIBRARY_VERSION, "worlds": worlds}
+    with open(path / INDEX_FILE, "w") as f:
+        json.dump(index, f)
+    return path
+
+
+class WorldLibrary:
+    """Read-only view over a library written by build_world_library.
+
+    The coins are memory-mapped, so opening the library costs only reading the index.
+    """
+
+    def __init__(self, path: Union[str, Path] = WORLD_LIBRARY_PATH) -> None:
+        self.path = Path(path)
+        with open(self.path / INDEX_FILE) as f:
+            index = json.load(f)
+        if index.get("version") != WORLD_LIBRARY_VERSION:
+            raise ValueError(f"Unsupported world library version: {index.get('version')}. Expected {WORLD_LIBRARY_VERSION}.")
+        self.index: List[Dict[str, Any]] = index["worlds"]
+        self.coins: NDArray[np.int16] = np.load(self.path / COINS_FILE, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get(self, i: int) -> World:
+        entry = self.index[i]
+        offset = entry["offset"]
+        return World.from_coins(
+            coins=self.coins[offset:offset + entry["num_coins"]],
+            width=entry["width"],
+            height=entry["height"],
+            num_centroids=entry["num_centroids"],
+            distribution=entry["distribution"],
+            dispersion=entry["dispersion"],
+        )
+
+    def select(
+        self,
+        distribution: Optional[str] = None,
+        dispersion: Optional[float] = None,
+        num_centroids: Optional[int] = None,
+        num_coins: Optional[int] = None,
+    ) -> List[int]:
+        """Indices of the worlds matching all the given settings."""
+        criteria = {
+            "distribution": distribution,
+            "dispersion": dispersion,
+            "num_centroids": num_centroids,
+            "num_coins": num_coins,
+        }
+        criteria = {key: value for key, value in criteria.items() if value is not None}
+        return [
+            i for i, entry in enumerate(self.index)
+            if all(entry[key] == value for key, value in criteria.items())
+        ]
+
+    @classmethod
+    def exists(cls, path: Union[str, Path] = WORLD_LIBRARY_PATH) -> bool:
+        path = Path(path)
+        return (path / INDEX_FILE).exists() and (path / COINS_FILE).exists()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the library of pregenerated worlds.")
+    parser.add_argument("--out", type=str, default=str(WORLD_LIBRARY_PATH))
+    parser.add_argument("--distributions", type=str, nargs="+", default=["linear", "circular", "oval"])
+    parser.add_argument("--dispersions", type=float, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--centroids", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--worlds-per-setting", type=int, default=20)
+    parser.add_argument("--num-coins", type=int, default=NUM_COINS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    path = build_world_library(
+        path=args.out,
+        distributions=args.distributions,
+        dispersions=args.dispersions,
+        num_centroids=args.centroids,
+        worlds_per_setting=args.worlds_per_setting,
+        num_coins=args.num_coins,
+        seed=args.seed,
+    )
+    print(f"Wrote {len(WorldLibrary(path))} worlds to {path}")
+
+
+if __name__ == "__main__":
+    main()